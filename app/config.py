@@ -10,24 +10,136 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-key-change-me")
 _default_db_path = BASE_DIR / "financetracker.db"
 DATABASE_URL: str = os.getenv("DATABASE_URL", f"sqlite:///{_default_db_path}")
-# Render and some hosts give postgres://; SQLAlchemy needs postgresql://
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = "postgresql://" + DATABASE_URL[len("postgres://") :]
-# Render Postgres requires SSL
-if "postgresql" in DATABASE_URL and "sslmode" not in DATABASE_URL:
-    DATABASE_URL += "?sslmode=require" if "?" not in DATABASE_URL else "&sslmode=require"
-if "sqlite" in DATABASE_URL and "///" in DATABASE_URL:
-    path_part = DATABASE_URL.split("///", 1)[-1]
-    if path_part.startswith("./") or (path_part != "" and not path_part.startswith("/") and ":" not in path_part[:2]):
-        DATABASE_URL = f"sqlite:///{BASE_DIR / path_part.lstrip('./')}"
+# An async driver in the URL (sqlite+aiosqlite://, postgresql+asyncpg://) makes requests use an
+# AsyncSession; DATABASE_URL itself is always reduced to the sync form for startup and scripts.
+_ASYNC_DRIVERS = ("+aiosqlite", "+asyncpg")
+USE_ASYNC_DB: bool = any(d in DATABASE_URL.split("://", 1)[0] for d in _ASYNC_DRIVERS)
+
+
+def _sync_url(url: str) -> str:
+    """Sync driver form of a database URL, with host-specific fixes applied."""
+    scheme, rest = url.split("://", 1)
+    if any(d in scheme for d in _ASYNC_DRIVERS):
+        url = scheme.split("+", 1)[0] + "://" + rest
+    # Render and some hosts give postgres://; SQLAlchemy needs postgresql://
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://") :]
+    # Render Postgres requires SSL
+    if "postgresql" in url and "sslmode" not in url:
+        url += "?sslmode=require" if "?" not in url else "&sslmode=require"
+    if "sqlite" in url and "///" in url:
+        path_part = url.split("///", 1)[-1]
+        if path_part.startswith("./") or (path_part != "" and not path_part.startswith("/") and ":" not in path_part[:2]):
+            url = f"sqlite:///{BASE_DIR / path_part.lstrip('./')}"
+    return url
+
+
+def _async_url(url: str) -> str:
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite" + url[len("sqlite") :]
+    # asyncpg takes ssl= rather than libpq's sslmode=
+    return "postgresql+asyncpg" + url[len("postgresql") :].replace("sslmode=", "ssl=")
+
+
+DATABASE_URL = _sync_url(DATABASE_URL)
+ASYNC_DATABASE_URL: str | None = _async_url(DATABASE_URL) if USE_ASYNC_DB else None
+
+# Optional read replica (or second SQLite file) for reporting reads: dashboard, insights, the
+# transaction list and exports. Same driver rules as DATABASE_URL. After a user writes, their
+# requests stay on the primary for READ_STICKY_SECONDS (keep it above the replica's usual lag).
+DATABASE_READ_URL: str | None = _sync_url(os.environ["DATABASE_READ_URL"]) if os.getenv("DATABASE_READ_URL") else None
+ASYNC_DATABASE_READ_URL: str | None = _async_url(DATABASE_READ_URL) if DATABASE_READ_URL and USE_ASYNC_DB else None
+READ_STICKY_SECONDS: int = int(os.getenv("READ_STICKY_SECONDS", "5"))
+READ_STICKY_COOKIE = "financetracker_primary"
+
+# Connection pool, per engine (primary, read, and their async twins). Pre-ping and recycling
+# replace connections the server (or a proxy) closed while idle, instead of failing a request.
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+# LIFO reuses the most recent connections, letting surplus ones sit idle and be recycled
+DB_POOL_USE_LIFO: bool = os.getenv("DB_POOL_USE_LIFO", "1").lower() in ("1", "true", "yes")
+# Connections each engine opens at startup, so the first requests after a deploy do not pay
+# for connecting (capped at DB_POOL_SIZE; 0 = off)
+DB_POOL_WARMUP: int = int(os.getenv("DB_POOL_WARMUP", str(DB_POOL_SIZE)))
+# Postgres statement timeouts in ms by query class (0 = none). "web" is every connection's
+# default; reports (insights, exports) and bulk work (imports, migrations, rebuilds) raise it
+# for their own transaction. SQLite has no statement timeout.
+DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+DB_REPORT_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_REPORT_STATEMENT_TIMEOUT_MS", "30000"))
+DB_BULK_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_BULK_STATEMENT_TIMEOUT_MS", "0"))
+
+# Startup creates tables, applies migrations and seeds categories (one worker at a time, under
+# a cross-process lock). Set to 0 when a release step runs `python scripts/migrate.py upgrade`,
+# so scaled-out workers start without touching the schema.
+DB_INIT_ON_STARTUP: bool = os.getenv("DB_INIT_ON_STARTUP", "1").lower() in ("1", "true", "yes")
 
 # JWT
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRE_HOURS = 1
 COOKIE_NAME = "financetracker_token"
+# Verified-token cache (entries also expire with the token)
+TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL: float = float(os.getenv("TOKEN_CACHE_TTL", "300"))
+
+# Password hashing: bcrypt runs in a worker pool ("thread" or "process"). Requests beyond
+# workers + queue size are turned away with 503 instead of piling up.
+BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_POOL: str = os.getenv("HASH_POOL", "thread")
+HASH_WORKERS: int = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_QUEUE_SIZE: int = int(os.getenv("HASH_QUEUE_SIZE", "16"))
+
+# Per-user category cache, validated against the data version (see DATA_VERSION_TTL)
+CATEGORY_CACHE_SIZE: int = int(os.getenv("CATEGORY_CACHE_SIZE", "10000"))
+CATEGORY_CACHE_TTL: float = float(os.getenv("CATEGORY_CACHE_TTL", "60"))
+
+# Per-user data version and versioned result cache. Local writes invalidate versions
+# immediately; DATA_VERSION_TTL bounds how long another worker's write can go unseen.
+DATA_VERSION_TTL: float = float(os.getenv("DATA_VERSION_TTL", "5"))
+RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", "5000"))
+
+# SQLite: WAL lets readers run alongside the single writer; busy_timeout is how long a
+# writer waits for the lock before "database is locked". synchronous=NORMAL is the usual
+# WAL pairing (durable across app crashes; a power loss can drop the last commits).
+SQLITE_WAL: bool = os.getenv("SQLITE_WAL", "1").lower() in ("1", "true", "yes")
+SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+# Group commit: transaction creates/updates/deletes from all requests are applied by one
+# writer and committed together, collecting for up to GROUP_COMMIT_WINDOW_MS. Mainly for
+# SQLite under bursty writes.
+GROUP_COMMIT: bool = os.getenv("GROUP_COMMIT", "0").lower() in ("1", "true", "yes")
+GROUP_COMMIT_WINDOW_MS: float = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "2"))
+GROUP_COMMIT_MAX_BATCH: int = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "200"))
+
+# Per-request SQL stats. Headers (X-DB-Queries, Server-Timing) default to off on Render.
+# A statement repeated SQL_N_PLUS_ONE_THRESHOLD times in one request is flagged as N+1;
+# SQL_MAX_QUERIES (0 = no limit) caps queries per request. Both log a warning, and with
+# SQL_STRICT=1 (tests, benchmarks) raise instead.
+SQL_STATS_HEADERS: bool = os.getenv("SQL_STATS_HEADERS", "0" if os.getenv("RENDER") else "1").lower() in ("1", "true", "yes")
+SQL_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+SQL_MAX_QUERIES: int = int(os.getenv("SQL_MAX_QUERIES", "0"))
+SQL_STRICT: bool = os.getenv("SQL_STRICT", "0").lower() in ("1", "true", "yes")
+
+# /metrics (Prometheus text format) is served only when METRICS_TOKEN is set, and only
+# to requests with "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_TOKEN: str | None = os.getenv("METRICS_TOKEN") or None
 
 # Pagination
 DEFAULT_PAGE_SIZE = 20
 
+# Rows fetched per round trip when streaming exports
+EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Rows inserted (and committed) per batch when importing CSV/OFX files
+IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+
+# Templates. Precompiling loads every template at startup and stops re-checking the
+# files on each render; on by default on Render. TEMPLATE_CACHE_DIR adds a Jinja2
+# bytecode cache so restarted workers skip parsing.
+TEMPLATE_PRECOMPILE: bool = os.getenv("TEMPLATE_PRECOMPILE", "1" if os.getenv("RENDER") else "0").lower() in ("1", "true", "yes")
+TEMPLATE_CACHE_DIR: str | None = os.getenv("TEMPLATE_CACHE_DIR") or None
+
 # Cache busting for static assets (Render sets RENDER_GIT_COMMIT)
 ASSET_VERSION: str = os.getenv("RENDER_GIT_COMMIT", "dev")
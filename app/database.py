@@ -1,28 +1,308 @@
 """Database engine, session, and base model."""
-from collections.abc import Generator
+import functools
+import time
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 
-from sqlalchemy import create_engine
+from sqlalchemy import Connection, create_engine, event, exc, make_url, text
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
-from app.config import DATABASE_URL
-
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=False,
+from app.config import (
+    DATABASE_URL, ASYNC_DATABASE_URL, DATABASE_READ_URL, ASYNC_DATABASE_READ_URL,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_POOL_USE_LIFO,
+    DB_POOL_WARMUP, DB_STATEMENT_TIMEOUT_MS, DB_REPORT_STATEMENT_TIMEOUT_MS, DB_BULK_STATEMENT_TIMEOUT_MS,
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_SYNCHRONOUS, SQLITE_WAL,
 )
+from app.metrics import db_pool_checkout_seconds, db_pool_timeouts
+
+# Postgres statement timeout (ms, 0 = none) by query class; see statement_timeout()
+STATEMENT_TIMEOUTS = {
+    "web": DB_STATEMENT_TIMEOUT_MS,
+    "report": DB_REPORT_STATEMENT_TIMEOUT_MS,
+    "bulk": DB_BULK_STATEMENT_TIMEOUT_MS,
+}
+
+
+class _TimedCheckout:
+    """Pool mixin: record how long each checkout waited (queueing, plus connecting when the
+    pool has to open a connection) and count checkouts that timed out."""
+
+    label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            db_pool_timeouts.inc((self.label,))
+            raise
+        finally:
+            db_pool_checkout_seconds.observe(self.label, time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.label = self.label
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_kwargs(url: str, is_async: bool = False) -> dict:
+    """Pool settings from app.config, plus per-driver connect arguments."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        kwargs = {"connect_args": {"check_same_thread": False}}
+        if parsed.database in (None, "", ":memory:") or parsed.query.get("mode") == "memory":
+            # In-memory databases exist per connection; keep SQLAlchemy's default pool
+            return kwargs
+    elif parsed.get_driver_name() == "asyncpg":
+        kwargs = {"connect_args": {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}}
+    else:
+        kwargs = {"connect_args": {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}}
+    kwargs.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_use_lifo=DB_POOL_USE_LIFO,
+    )
+    return kwargs
+
+
+def _create_engine(url: str, label: str):
+    eng = create_engine(url, echo=False, **_engine_kwargs(url))
+    eng.pool.label = label
+    return eng
+
+
+def _create_async_engine(url: str, label: str):
+    eng = create_async_engine(url, echo=False, **_engine_kwargs(url, is_async=True))
+    eng.sync_engine.pool.label = label
+    return eng
+
+
+engine = _create_engine(DATABASE_URL, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine, only when DATABASE_URL names an async driver (see app.config)
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DATABASE_URL:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = _create_async_engine(ASYNC_DATABASE_URL, "async")
+    # No expiry on commit: templates read attributes after the handler's last await
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Read engine (replica) with its own pool, only when DATABASE_READ_URL is set. Sessions on
+# it are tagged info["replica"] so caches can tell replica reads from primary reads.
+read_engine = None
+ReadSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+if DATABASE_READ_URL:
+    read_engine = _create_engine(DATABASE_READ_URL, "read")
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, info={"replica": True})
+    if ASYNC_DATABASE_READ_URL:
+        async_read_engine = _create_async_engine(ASYNC_DATABASE_READ_URL, "async_read")
+        AsyncReadSessionLocal = async_sessionmaker(
+            async_read_engine, autoflush=False, expire_on_commit=False, info={"replica": True},
+        )
+
+
+def sync_engines() -> dict:
+    """Every configured engine by name, as sync Engine objects (for events and pool stats)."""
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    if read_engine is not None:
+        engines["read"] = read_engine
+    if async_read_engine is not None:
+        engines["async_read"] = async_read_engine.sync_engine
+    return engines
+
+
+def statement_timeout(db: Session | Connection, query_class: str) -> None:
+    """Apply query_class's statement timeout to the rest of the current transaction.
+
+    Postgres only (set_config(..., is_local=true), so it ends with the transaction and
+    never leaks into the pool); a no-op on SQLite.
+    """
+    dialect = db.get_bind().dialect if isinstance(db, Session) else db.dialect
+    if dialect.name != "postgresql":
+        return
+    db.execute(
+        text("SELECT set_config('statement_timeout', :ms, true)"),
+        {"ms": str(STATEMENT_TIMEOUTS[query_class])},
+    )
+
+
+async def warm_up_pools(connections: int = DB_POOL_WARMUP) -> dict[str, int]:
+    """Open up to `connections` pooled connections per engine (capped at the pool size) and
+    return them to the pool, so the first requests after a start do not wait for connects."""
+    opened = {}
+    for name, eng in (("sync", engine), ("read", read_engine)):
+        if eng is None or not isinstance(eng.pool, QueuePool):
+            continue
+        # Hold them all at once so the pool has to open that many
+        conns = [eng.connect() for _ in range(min(connections, eng.pool.size()))]
+        for conn in conns:
+            conn.exec_driver_sql("SELECT 1")
+            conn.close()
+        opened[name] = len(conns)
+    for name, eng in (("async", async_engine), ("async_read", async_read_engine)):
+        if eng is None or not isinstance(eng.sync_engine.pool, QueuePool):
+            continue
+        conns = [await eng.connect() for _ in range(min(connections, eng.sync_engine.pool.size()))]
+        for conn in conns:
+            await conn.exec_driver_sql("SELECT 1")
+            await conn.close()
+        opened[name] = len(conns)
+    return opened
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {int(SQLITE_BUSY_TIMEOUT_MS)}")
+    if SQLITE_WAL:
+        # Persistent per database file; in-memory databases just report "memory"
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+    cursor.close()
+
+
+for _engine in sync_engines().values():
+    if _engine.dialect.name == "sqlite":
+        event.listen(_engine, "connect", _sqlite_pragmas)
+
+
+class QueryStats:
+    """Statements executed within one scope (normally one request)."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Bulk jobs (imports) repeat statements by design; they are exempt from checks
+        self.bulk = False
+        # SQL text -> [executions, total seconds, slowest seconds]
+        self.statements: dict[str, list] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def slowest(self, n: int = 3) -> list[tuple[str, float]]:
+        """The n statements with the slowest single execution, as (sql, seconds)."""
+        ranked = sorted(self.statements.items(), key=lambda kv: kv[1][2], reverse=True)
+        return [(sql, entry[2]) for sql, entry in ranked[:n]]
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run at least threshold times: the N+1 pattern. (sql, executions)."""
+        if self.bulk or not threshold:
+            return []
+        return [(sql, e[0]) for sql, e in self.statements.items() if e[0] >= threshold]
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Record every statement run in this context (including threadpool and run_sync work)."""
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def mark_bulk_queries() -> None:
+    """Exempt the current scope from N+1 and query-count checks (batch jobs)."""
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.bulk = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _query_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats.get()
+    starts = conn.info.get("query_start")
+    if stats is not None and starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def instrument_engine(sync_engine) -> None:
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+for _engine in sync_engines().values():
+    instrument_engine(_engine)
+
 
 class Base(DeclarativeBase):
     """Base class for all models."""
     pass
 
 
-def get_db() -> Generator[Session, None, None]:
-    """Dependency that yields a DB session."""
+async def get_db() -> AsyncGenerator:
+    """Dependency that yields a DB session (AsyncSession when an async driver is configured)."""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def read_session_factories(primary: bool = False) -> tuple[Callable | None, Callable[[], Session]]:
+    """(async factory or None, sync factory) for reads: the read engine's, or the primary's
+    when primary is set or no DATABASE_READ_URL is configured. See app.dependencies.get_read_db."""
+    if primary or ReadSessionLocal is None:
+        return AsyncSessionLocal, SessionLocal
+    return AsyncReadSessionLocal, ReadSessionLocal
+
+
+async def run_db(db, fn: Callable, *args, **kwargs):
+    """Run sync ORM code fn(session, ...) without blocking the event loop.
+
+    On an AsyncSession it runs via run_sync on the async connection; on a plain
+    Session it runs in the threadpool.
+    """
+    if isinstance(db, Session):
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+    return await db.run_sync(fn, *args, **kwargs)
+
+
+def async_service(fn: Callable) -> Callable:
+    """Build the async twin of a sync service function taking a session first."""
+    @functools.wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        return await run_db(db, fn, *args, **kwargs)
+    return wrapper
@@ -1,16 +1,42 @@
 """FastAPI dependencies (e.g. auth)."""
+import time
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+
 from fastapi import Request, Depends
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.config import COOKIE_NAME, SECRET_KEY
+from app.cache import TTLCache
+from app.database import SessionLocal, get_db, read_session_factories, run_db
+from app.config import COOKIE_NAME, READ_STICKY_COOKIE, SECRET_KEY, TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL
 from app.models import User
 
 
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """Identity of the logged-in user, detached from any DB session."""
+    id: int
+    email: str
+
+
+# Verified token -> CurrentUser. Entries never outlive the token's exp.
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+
+
+def invalidate_token(token: str | None) -> None:
+    if token:
+        token_cache.pop(token)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop every cached token for a user; call after changing or deleting the user."""
+    token_cache.discard_where(lambda _, u: u is not None and u.id == user_id)
+
+
 async def get_current_user(
-    request: Request, db: Session = Depends(get_db)
-) -> User:
+    request: Request, db=Depends(get_db)
+) -> CurrentUser:
     """Require authenticated user; redirect to login if not."""
     user = await get_current_user_optional(request, db)
     if user is None:
@@ -22,12 +48,19 @@ async def get_current_user(
 
 
 async def get_current_user_optional(
-    request: Request, db: Session = Depends(get_db)
-) -> User | None:
-    """Return current user if authenticated, else None."""
+    request: Request, db=Depends(get_db)
+) -> CurrentUser | None:
+    """Return current user if authenticated, else None.
+
+    Verified tokens are cached, so repeat requests skip both JWT verification and the
+    users lookup.
+    """
     token = request.cookies.get(COOKIE_NAME)
     if not token:
         return None
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     from jose import jwt, JWTError
     from app.config import JWT_ALGORITHM
     try:
@@ -35,7 +68,62 @@ async def get_current_user_optional(
         user_id = payload.get("sub")
         if user_id is None:
             return None
-        user = db.get(User, int(user_id))
-        return user
-    except (JWTError, ValueError, TypeError):
+        user = await run_db(db, Session.get, User, int(user_id))
+        if user is None:
+            return None
+        current = CurrentUser(id=user.id, email=user.email)
+        token_cache.set(token, current, ttl=float(payload["exp"]) - time.time())
+        return current
+    except (JWTError, ValueError, TypeError, KeyError):
         return None
+
+
+def reads_from_primary(request: Request) -> bool:
+    """True while the client's read-your-writes window is open (set by ReadYourWritesMiddleware)."""
+    until = request.cookies.get(READ_STICKY_COOKIE)
+    try:
+        return until is not None and float(until) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request) -> AsyncGenerator:
+    """Like get_db, but on the read engine (DATABASE_READ_URL) unless this client wrote recently.
+
+    For read-only routes; without DATABASE_READ_URL it is the same as get_db.
+    """
+    from app.metrics import db_read_sessions
+    async_factory, sync_factory = read_session_factories(primary=reads_from_primary(request))
+    db_read_sessions.inc(("primary" if sync_factory is SessionLocal else "replica",))
+    if async_factory is not None:
+        async with async_factory() as db:
+            yield db
+        return
+    db = sync_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def is_htmx_fragment(request: Request) -> bool:
+    """True for HTMX requests that swap part of a page.
+
+    History-restore requests (back button after a cache miss) need the full page.
+    """
+    return (
+        request.headers.get("hx-request") == "true"
+        and request.headers.get("hx-history-restore-request") != "true"
+    )
+
+
+async def track_in_flight(request: Request):
+    """App-wide dependency: count requests in progress per route for /metrics."""
+    from app.metrics import http_in_flight
+    from app.middleware import route_name
+    labels = (route_name(request.scope),)
+    http_in_flight.inc(labels)
+    try:
+        yield
+    finally:
+        http_in_flight.dec(labels)
@@ -0,0 +1,48 @@
+"""Conditional GET support: per-user page ETags and 304 responses."""
+import hashlib
+import time
+from datetime import date
+
+from fastapi import Request, Response
+
+from app.config import ASSET_VERSION
+
+# Pages embed a CSRF token valid for an hour; rotating the ETag every half hour means a
+# revalidated page never carries a token with less than 30 minutes left.
+CSRF_ROTATE_SECONDS = 1800
+
+
+def page_etag(request: Request, user_id: int, data_version: int) -> str:
+    """Weak ETag for a user's page: URL, HTMX-ness, data version, day, deploy, CSRF window."""
+    key = "|".join([
+        request.url.path,
+        request.url.query,
+        request.headers.get("hx-request", ""),
+        str(user_id),
+        str(data_version),
+        date.today().isoformat(),
+        ASSET_VERSION,
+        str(int(time.time() // CSRF_ROTATE_SECONDS)),
+    ])
+    return 'W/"' + hashlib.sha1(key.encode()).hexdigest()[:24] + '"'
+
+
+def _headers(etag: str) -> dict:
+    # private: per-user content; no-cache: always revalidate, which is cheap on a match
+    return {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Cookie, HX-Request"}
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """A 304 response if the client's If-None-Match matches etag, else None."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = [t.strip() for t in header.split(",")]
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers=_headers(etag))
+    return None
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.headers.update(_headers(etag))
+    return response
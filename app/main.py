@@ -1,35 +1,68 @@
 """FastAPI application entry point."""
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 
-from app.config import BASE_DIR, ASSET_VERSION
-from app.database import Base, engine, get_db, SessionLocal
-from app.routers import auth, dashboard, categories, transactions, insights
-from app.services.categories import seed_predefined_categories
-
-# Create tables
-Base.metadata.create_all(bind=engine)
-# Seed predefined categories
-db = SessionLocal()
-try:
-    seed_predefined_categories(db)
-finally:
-    db.close()
-
-app = FastAPI(title="FinanceTracker")
+from app.config import (
+    BASE_DIR, ASSET_VERSION, DATABASE_READ_URL, DB_INIT_ON_STARTUP, TEMPLATE_CACHE_DIR, TEMPLATE_PRECOMPILE,
+)
+from app.database import engine, get_db, warm_up_pools
+from app.dependencies import track_in_flight
+from app.metrics import template_render_seconds
+from app.middleware import MetricsMiddleware, QueryStatsMiddleware, ReadYourWritesMiddleware
+from app.routers import auth, dashboard, categories, budgets, transactions, insights, metrics
+from app.startup import initialize_database
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once per worker before it serves; workers take turns under the init lock
+    if DB_INIT_ON_STARTUP:
+        initialize_database(engine)
+    await warm_up_pools()
+    yield
+
+
+app = FastAPI(title="FinanceTracker", lifespan=lifespan, dependencies=[Depends(track_in_flight)])
+if DATABASE_READ_URL:
+    app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+# Added last so it is outermost and times everything inside it
+app.add_middleware(MetricsMiddleware)
 
 # Jinja2
 templates_dir = Path(__file__).resolve().parent / "templates"
+bytecode_cache = None
+if TEMPLATE_CACHE_DIR:
+    Path(TEMPLATE_CACHE_DIR).mkdir(parents=True, exist_ok=True)
+    bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
 env = Environment(
     loader=FileSystemLoader(str(templates_dir)),
     autoescape=select_autoescape(["html", "xml"]),
+    bytecode_cache=bytecode_cache,
+    # Precompiled: never stat template files again and never evict a compiled template
+    auto_reload=not TEMPLATE_PRECOMPILE,
+    cache_size=-1 if TEMPLATE_PRECOMPILE else 400,
 )
 
 
+def precompile_templates() -> int:
+    """Compile every template into the environment cache. Returns how many."""
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+if TEMPLATE_PRECOMPILE:
+    precompile_templates()
+
+
 def render_template(request: Request, name: str, context: dict) -> HTMLResponse:
     """Render a Jinja2 template with request in context."""
     from app.csrf import generate_csrf_token
@@ -40,7 +73,10 @@ def render_template(request: Request, name: str, context: dict) -> HTMLResponse:
         **context,
     }
     template = env.get_template(name)
-    return HTMLResponse(template.render(ctx))
+    start = time.perf_counter()
+    html = template.render(ctx)
+    template_render_seconds.observe(name, time.perf_counter() - start)
+    return HTMLResponse(html)
 
 
 # Expose render_template to routers via app state
@@ -55,8 +91,10 @@ if static_dir.exists():
 app.include_router(auth.router, prefix="", tags=["auth"])
 app.include_router(dashboard.router, prefix="", tags=["dashboard"])
 app.include_router(categories.router, prefix="/categories", tags=["categories"])
+app.include_router(budgets.router, prefix="/budgets", tags=["budgets"])
 app.include_router(transactions.router, prefix="/transactions", tags=["transactions"])
 app.include_router(insights.router, prefix="/insights", tags=["insights"])
+app.include_router(metrics.router, prefix="", tags=["metrics"])
 
 
 @app.get("/")
@@ -68,11 +106,15 @@ async def root(request: Request):
 
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
-    return render_template(request, "errors/404.html", {})
+    response = render_template(request, "errors/404.html", {})
+    response.status_code = 404
+    return response
 
 
 @app.exception_handler(Exception)
 async def server_error_handler(request: Request, exc: Exception):
     import logging
     logging.exception("Unhandled error: %s", exc)
-    return render_template(request, "errors/500.html", {"error": str(exc)})
+    response = render_template(request, "errors/500.html", {"error": str(exc)})
+    response.status_code = 500
+    return response
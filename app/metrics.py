@@ -0,0 +1,229 @@
+"""In-process metrics (histograms, counters, gauges) and Prometheus text rendering.
+
+Values are per process: with several workers each one reports its own.
+"""
+import threading
+
+# Upper bounds in seconds, Prometheus style (each bucket counts observations <= bound)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    """Thread-safe cumulative histogram per label, plus count, sum and max."""
+
+    def __init__(self, label_name: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.label_name = label_name
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label: str, seconds: float) -> None:
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(self.buckets)}
+                self._series[label] = series
+            series["count"] += 1
+            series["sum"] += seconds
+            if seconds > series["max"]:
+                series["max"] = seconds
+            counts = series["buckets"]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+
+    def snapshot(self) -> dict[str, dict]:
+        """Copy of every series: {label: {"count", "sum", "max", "buckets": [...]}}."""
+        with self._lock:
+            return {
+                label: {**s, "buckets": list(s["buckets"])}
+                for label, s in self._series.items()
+            }
+
+    def summary(self) -> list[dict]:
+        """Per-label count, mean and max in milliseconds, slowest mean first."""
+        rows = [
+            {
+                "label": label,
+                "count": s["count"],
+                "mean_ms": round(s["sum"] / s["count"] * 1000, 3),
+                "max_ms": round(s["max"] * 1000, 3),
+            }
+            for label, s in self.snapshot().items()
+        ]
+        return sorted(rows, key=lambda r: r["mean_ms"], reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """Thread-safe values keyed by a tuple of label values."""
+
+    def __init__(self, label_names: tuple[str, ...]):
+        self.label_names = label_names
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def snapshot(self) -> dict[tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    """A Counter that can go down (in-flight requests)."""
+
+    def dec(self, labels: tuple, amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+# Time spent in Template.render, by top-level template name
+template_render_seconds = Histogram("template")
+# HTTP, by route name (see app.middleware.route_name)
+http_request_seconds = Histogram("route")
+http_responses = Counter(("route", "status"))
+http_in_flight = Gauge(("route",))
+# Login outcomes: success, failure, busy (hash pool saturated)
+login_attempts = Counter(("outcome",))
+# Time to get a connection from each engine's pool (includes connecting when the pool grows)
+db_pool_checkout_seconds = Histogram(
+    "engine", buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_timeouts = Counter(("engine",))
+# get_read_db sessions by target: replica, or primary (no read engine, or read-your-writes window)
+db_read_sessions = Counter(("target",))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Exposition:
+    """Builds the Prometheus text format, one metric family at a time."""
+
+    def __init__(self, prefix: str = "financetracker_"):
+        self.prefix = prefix
+        self.lines: list[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> str:
+        name = self.prefix + name
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        return name
+
+    def sample(self, name: str, value: float, names: tuple = (), values: tuple = ()) -> None:
+        self.lines.append(f"{name}{_labels(names, values)} {_number(value)}")
+
+    def counter(self, name: str, help_text: str, counter: Counter, kind: str = "counter") -> None:
+        full = self.family(name, kind, help_text)
+        for values, value in sorted(counter.snapshot().items()):
+            self.sample(full, value, counter.label_names, values)
+
+    def histogram(self, name: str, help_text: str, histogram: Histogram) -> None:
+        full = self.family(name, "histogram", help_text)
+        names = (histogram.label_name,)
+        for label, series in sorted(histogram.snapshot().items()):
+            bounds = [str(b) for b in histogram.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, series["buckets"] + [series["count"]]):
+                le = 'le="' + bound + '"'
+                self.lines.append(f"{full}_bucket{_labels(names, (label,), le)} {count}")
+            self.lines.append(f"{full}_sum{_labels(names, (label,))} {_number(series['sum'])}")
+            self.lines.append(f"{full}_count{_labels(names, (label,))} {series['count']}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _pool_stats() -> dict[str, dict]:
+    from app.database import sync_engines
+    stats = {}
+    for name, eng in sync_engines().items():
+        pool = eng.pool
+        # NullPool/StaticPool have no sizing to report
+        if hasattr(pool, "checkedout"):
+            stats[name] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+    return stats
+
+
+def _caches() -> dict:
+    from app.dependencies import token_cache
+    from app.services.categories import category_cache
+    from app.services.data_version import version_cache, result_cache
+    return {"token": token_cache, "category": category_cache, "data_version": version_cache, "result": result_cache}
+
+
+def render_prometheus() -> str:
+    """Every metric in Prometheus text exposition format (version 0.0.4)."""
+    from app.services.auth import hash_pool_in_flight
+    out = Exposition()
+    out.histogram("http_request_duration_seconds", "Request latency by route.", http_request_seconds)
+    out.counter("http_responses_total", "Responses by route and status code.", http_responses)
+    out.counter("http_requests_in_flight", "Requests being handled, by route.", http_in_flight, kind="gauge")
+    out.histogram("template_render_seconds", "Jinja2 render time by template.", template_render_seconds)
+    out.counter("login_attempts_total", "Login attempts by outcome.", login_attempts)
+    out.counter("db_read_sessions_total", "Read-route sessions by target engine.", db_read_sessions)
+    name = out.family("hash_pool_in_flight", "gauge", "bcrypt jobs running or queued in the hash pool.")
+    out.sample(name, hash_pool_in_flight())
+
+    from app.write_queue import write_queue
+    for field, kind, help_text in (
+        ("jobs", "counter", "Writes applied by the group-commit writer."),
+        ("batches", "counter", "Group commits (jobs / batches = mean group size)."),
+        ("failed_batches", "counter", "Group commits that failed and were rolled back."),
+        ("largest_batch", "gauge", "Largest group committed so far."),
+    ):
+        name = out.family("group_commit_" + field + ("_total" if kind == "counter" else ""), kind, help_text)
+        out.sample(name, getattr(write_queue, field))
+    name = out.family("group_commit_queue_depth", "gauge", "Writes waiting for the group-commit writer.")
+    out.sample(name, write_queue.depth())
+
+    caches = _caches()
+    for field, kind, help_text in (
+        ("hits", "counter", "Cache hits."),
+        ("misses", "counter", "Cache misses."),
+        ("size", "gauge", "Entries currently cached."),
+        ("hit_rate", "gauge", "Hits / (hits + misses) since start."),
+    ):
+        metric = "cache_" + field + ("_total" if kind == "counter" else "")
+        name = out.family(metric, kind, help_text)
+        for cache_name, cache in caches.items():
+            out.sample(name, cache.stats()[field], ("cache",), (cache_name,))
+
+    out.histogram("db_pool_checkout_wait_seconds", "Wait for a pooled connection, by engine.", db_pool_checkout_seconds)
+    out.counter("db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT.", db_pool_timeouts)
+    pools = _pool_stats()
+    for field, help_text in (
+        ("size", "Configured pool size."),
+        ("checked_out", "Connections in use."),
+        ("checked_in", "Idle connections in the pool."),
+        ("overflow", "Connections beyond pool size (negative: not yet opened)."),
+    ):
+        name = out.family(f"db_pool_{field}", "gauge", help_text)
+        for engine_name, stats in pools.items():
+            out.sample(name, stats[field], ("engine",), (engine_name,))
+    return out.render()
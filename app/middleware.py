@@ -0,0 +1,141 @@
+"""ASGI middleware: request metrics, per-request SQL statistics and N+1 detection, read routing."""
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from app.config import (
+    READ_STICKY_COOKIE, READ_STICKY_SECONDS, SQL_MAX_QUERIES, SQL_N_PLUS_ONE_THRESHOLD, SQL_STATS_HEADERS,
+    SQL_STRICT,
+)
+from app.database import QueryStats, track_queries
+from app.metrics import http_request_seconds, http_responses
+
+logger = logging.getLogger("app.sql")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more queries than allowed, or repeated one statement (N+1)."""
+
+
+def query_problems(stats: QueryStats) -> list[str]:
+    problems = []
+    if SQL_MAX_QUERIES and stats.count > SQL_MAX_QUERIES and not stats.bulk:
+        problems.append(f"{stats.count} queries (limit {SQL_MAX_QUERIES})")
+    for sql, times in stats.repeated(SQL_N_PLUS_ONE_THRESHOLD):
+        problems.append(f"N+1: {times}x {' '.join(sql.split())[:200]}")
+    return problems
+
+
+class QueryStatsMiddleware:
+    """Count each request's SQL: headers on the response, a debug log line, and checks.
+
+    Work done after the response starts (streamed exports) is logged but is not in
+    the headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries() as stats:
+            async def send_with_stats(message):
+                if message["type"] == "http.response.start" and SQL_STATS_HEADERS:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(stats.count)
+                    headers.append("Server-Timing", f"db;dur={stats.seconds * 1000:.1f}")
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+        self.report(scope, stats)
+
+    @staticmethod
+    def report(scope, stats: QueryStats) -> None:
+        label = f"{scope['method']} {scope['path']}"
+        if logger.isEnabledFor(logging.DEBUG) and stats.count:
+            slowest = "; ".join(f"{s * 1000:.1f} ms {' '.join(sql.split())[:120]}" for sql, s in stats.slowest())
+            logger.debug("%s: %d queries, %.1f ms. Slowest: %s", label, stats.count, stats.seconds * 1000, slowest)
+        problems = query_problems(stats)
+        if not problems:
+            return
+        message = f"{label}: " + " | ".join(problems)
+        if SQL_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReadYourWritesMiddleware:
+    """After a successful write request, pin the client's reads to the primary for a while.
+
+    Sets a short-lived cookie holding the window's end; get_read_db honours it. A cookie
+    rather than server state, so the window follows the client to whichever worker
+    serves its next request.
+    """
+
+    UNSAFE_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+    def __init__(self, app, seconds: int = READ_STICKY_SECONDS):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in self.UNSAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = int(time.time()) + self.seconds
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{READ_STICKY_COOKIE}={until}; Max-Age={self.seconds}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def route_name(scope) -> str:
+    """Name of the route that handled the request, e.g. "transactions_list".
+
+    Routing records the matched route in the scope. Named routes keep metric labels
+    bounded where raw paths (with ids) would not be.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    return getattr(route, "name", None) or "unnamed"
+
+
+class MetricsMiddleware:
+    """Latency histogram and response status counts per route.
+
+    In-flight requests are counted by the track_in_flight dependency, which runs once
+    the route is known.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_name(scope)
+            http_request_seconds.observe(route, time.perf_counter() - start)
+            http_responses.inc((route, str(status)))
@@ -0,0 +1,143 @@
+"""Versioned schema migrations for existing databases, plus an index-usage check.
+
+New databases get the full schema from Base.metadata.create_all. Migrations bring
+databases created by older versions up to date; each runs once, in order, and is
+recorded in schema_migrations. Write them to be idempotent (checkfirst / IF NOT EXISTS)
+so they are no-ops on a freshly created schema.
+"""
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Connection, Engine, Column, Integer, String, DateTime, MetaData, Table, inspect, select, text
+
+from app.database import statement_timeout
+from app.models import Transaction, MonthlyRollup
+from app.services.search import create_search_index
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _create_model_indexes(*models) -> Callable[[Connection], None]:
+    def apply(conn: Connection) -> None:
+        for model in models:
+            for index in model.__table__.indexes:
+                index.create(conn, checkfirst=True)
+    return apply
+
+
+def _add_column(table: str, column: str, ddl: str) -> Callable[[Connection], None]:
+    def apply(conn: Connection) -> None:
+        if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return apply
+
+
+# (version, name, apply(conn)). Append only; never renumber.
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "transactions partial list/insights indexes", _create_model_indexes(Transaction)),
+    (2, "users.data_version", _add_column("users", "data_version", "INTEGER NOT NULL DEFAULT 0")),
+    (3, "transaction description full-text index", create_search_index),
+]
+
+
+def applied_versions(engine: Engine) -> set[int]:
+    _meta.create_all(engine, tables=[schema_migrations])
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    """Apply pending migrations, each in its own transaction. Returns versions applied."""
+    done = applied_versions(engine)
+    applied = []
+    for version, name, apply in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            statement_timeout(conn, "bulk")
+            apply(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=version, name=name, applied_at=datetime.utcnow(),
+            ))
+        applied.append(version)
+    return applied
+
+
+def _index_check_queries() -> dict:
+    """Representative hot-path statements and the index (or index names) each should use."""
+    from app.services.transactions import _filter_conditions
+    user_id, today = 1, date.today()
+    live = _filter_conditions(user_id, None, None, None, None)
+    newest = (Transaction.transaction_date.desc(), Transaction.id.desc())
+    month_start = today.replace(day=1)
+    return {
+        "list_transactions": (
+            select(Transaction).where(*live).order_by(*newest).limit(20),
+            "ix_transactions_user_date_live",
+        ),
+        "list_transactions_keyset": (
+            select(Transaction).where(
+                *live,
+                (Transaction.transaction_date < today)
+                | ((Transaction.transaction_date == today) & (Transaction.id < 1000)),
+            ).order_by(*newest).limit(21),
+            "ix_transactions_user_date_live",
+        ),
+        "list_transactions_category": (
+            select(Transaction)
+            .where(*_filter_conditions(user_id, None, None, 1, None))
+            .order_by(*newest).limit(20),
+            "ix_transactions_user_category_date_live",
+        ),
+        "get_recent_transactions": (
+            select(Transaction).where(*live).order_by(*newest).limit(10),
+            "ix_transactions_user_date_live",
+        ),
+        "insights_edge_days": (
+            select(Transaction.category_id, Transaction.type, Transaction.amount).where(
+                *live, Transaction.transaction_date.between(month_start, today),
+            ),
+            "ix_transactions_user_date_live",
+        ),
+        "insights_rollup_months": (
+            select(MonthlyRollup.category_id, MonthlyRollup.type, MonthlyRollup.total).where(
+                MonthlyRollup.user_id == user_id,
+                MonthlyRollup.month >= month_start - timedelta(days=365),
+                MonthlyRollup.month <= month_start,
+            ),
+            # The unique key's backing index; SQLite gives it an automatic name
+            ("uq_rollup_key", "sqlite_autoindex_monthly_rollups"),
+        ),
+    }
+
+
+def check_index_usage(engine: Engine) -> list[dict]:
+    """EXPLAIN each hot-path query and report whether the planner picks the expected index.
+
+    On Postgres sequential scans are disabled for the check so small tables still show
+    whether the index is usable.
+    """
+    dialect = engine.dialect
+    results = []
+    with engine.connect() as conn:
+        if dialect.name == "postgresql":
+            conn.execute(text("SET enable_seqscan = off"))
+        for name, (stmt, expected) in _index_check_queries().items():
+            sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+            if dialect.name == "sqlite":
+                plan = "\n".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql))
+            else:
+                plan = "\n".join(row[0] for row in conn.exec_driver_sql("EXPLAIN " + sql))
+            names = (expected,) if isinstance(expected, str) else expected
+            ok = any(n in plan for n in names)
+            results.append({"query": name, "index": names[0], "ok": ok, "plan": plan})
+        if dialect.name == "postgresql":
+            conn.rollback()
+    return results
@@ -2,5 +2,7 @@
 from app.models.user import User  # noqa: F401
 from app.models.category import Category  # noqa: F401
 from app.models.transaction import Transaction  # noqa: F401
+from app.models.rollup import MonthlyRollup  # noqa: F401
+from app.models.budget import Budget  # noqa: F401
 
-__all__ = ["User", "Category", "Transaction"]
+__all__ = ["User", "Category", "Transaction", "MonthlyRollup", "Budget"]
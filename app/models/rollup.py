@@ -0,0 +1,28 @@
+"""Monthly rollup model: per-user, per-month, per-category, per-type totals."""
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Numeric, Date, Integer, ForeignKey, Enum, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.transaction import TransactionType
+
+
+class MonthlyRollup(Base):
+    __tablename__ = "monthly_rollups"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # First day of the month
+    month: Mapped[date] = mapped_column(Date, nullable=False)
+    category_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=False
+    )
+    type: Mapped[TransactionType] = mapped_column(Enum(TransactionType), nullable=False)
+    total: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", "category_id", "type", name="uq_rollup_key"),
+    )
@@ -2,7 +2,7 @@
 from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import String, Numeric, Date, DateTime, Integer, ForeignKey, Enum
+from sqlalchemy import String, Numeric, Date, DateTime, Integer, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
@@ -31,5 +31,23 @@ class Transaction(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # Live rows per user in list order (list, recent, keyset pages); the trailing
+        # columns cover the insights edge-day aggregates without touching the table
+        Index(
+            "ix_transactions_user_date_live",
+            "user_id", "transaction_date", "id", "type", "category_id", "amount",
+            sqlite_where=text("deleted_at IS NULL"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # Category-filtered lists
+        Index(
+            "ix_transactions_user_category_date_live",
+            "user_id", "category_id", "transaction_date", "id",
+            sqlite_where=text("deleted_at IS NULL"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
+
     user = relationship("User", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
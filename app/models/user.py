@@ -1,7 +1,7 @@
 """User model."""
 from datetime import datetime
 
-from sqlalchemy import String, DateTime
+from sqlalchemy import String, DateTime, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -14,6 +14,8 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # Bumped by every transaction/category write; keys cached insights and page ETags
+    data_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     categories = relationship("Category", back_populates="user", foreign_keys="Category.user_id")
     transactions = relationship("Transaction", back_populates="user")
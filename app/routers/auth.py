@@ -1,7 +1,6 @@
 """Auth routes: login, register, logout."""
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
 
 from app.database import get_db
 
@@ -15,11 +14,21 @@ async def login_page(request: Request):
     return app.state.render_template(request, "auth/login.html", {"error": None, "next": next_url})
 
 
-async def _render_login(request: Request, db: Session | None, error: str | None = None, next_url: str = ""):
+async def _render_login(request: Request, db, error: str | None = None, next_url: str = ""):
     from app.main import app
     return app.state.render_template(request, "auth/login.html", {"error": error, "next": next_url})
 
 
+BUSY_MESSAGE = "The server is busy. Please try again in a moment."
+
+
+def _busy(response):
+    """Turn a rendered form into a 503 so clients back off and retry."""
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+
 @router.get("/register", name="register_page")
 async def register_page(request: Request):
     from app.main import app
@@ -27,8 +36,8 @@ async def register_page(request: Request):
 
 
 @router.post("/login", name="login_submit")
-async def login_submit(request: Request, db: Session = Depends(get_db)):
-    from app.services.auth import authenticate_user, create_access_token
+async def login_submit(request: Request, db=Depends(get_db)):
+    from app.services.auth import authenticate_user_async, create_access_token, HashPoolBusy
     from fastapi.responses import RedirectResponse
     from app.csrf import validate_csrf_token
     form = await request.form()
@@ -36,7 +45,13 @@ async def login_submit(request: Request, db: Session = Depends(get_db)):
         return await _render_login(request, db, error="Invalid request. Please try again.", next_url=form.get("next", ""))
     email = form.get("email", "").strip()
     password = form.get("password", "")
-    user = authenticate_user(db, email, password)
+    from app.metrics import login_attempts
+    try:
+        user = await authenticate_user_async(db, email, password)
+    except HashPoolBusy:
+        login_attempts.inc(("busy",))
+        return _busy(await _render_login(request, db, error=BUSY_MESSAGE, next_url=form.get("next", "")))
+    login_attempts.inc(("success" if user else "failure",))
     if not user:
         next_url = form.get("next", "")
         return await _render_login(request, db, error="Invalid email or password", next_url=next_url)
@@ -55,8 +70,8 @@ async def login_submit(request: Request, db: Session = Depends(get_db)):
 
 
 @router.post("/register", name="register_submit")
-async def register_submit(request: Request, db: Session = Depends(get_db)):
-    from app.services.auth import register_user, create_access_token
+async def register_submit(request: Request, db=Depends(get_db)):
+    from app.services.auth import register_user_async, create_access_token, HashPoolBusy
     from fastapi.responses import RedirectResponse
     from app.csrf import validate_csrf_token
     form = await request.form()
@@ -65,7 +80,11 @@ async def register_submit(request: Request, db: Session = Depends(get_db)):
         return app.state.render_template(request, "auth/register.html", {"error": "Invalid request. Please try again."})
     email = form.get("email", "").strip()
     password = form.get("password", "")
-    user, error = register_user(db, email, password)
+    try:
+        user, error = await register_user_async(db, email, password)
+    except HashPoolBusy:
+        from app.main import app
+        return _busy(app.state.render_template(request, "auth/register.html", {"error": BUSY_MESSAGE}))
     if error:
         from app.main import app
         return app.state.render_template(request, "auth/register.html", {"error": error})
@@ -83,7 +102,9 @@ async def register_submit(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/logout", name="logout")
-async def logout():
+async def logout(request: Request):
+    from app.dependencies import invalidate_token
+    invalidate_token(request.cookies.get("financetracker_token"))
     response = RedirectResponse(url="/login", status_code=303)
     response.delete_cookie("financetracker_token")
     return response
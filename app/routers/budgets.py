@@ -0,0 +1,52 @@
+"""Budget management routes."""
+from datetime import date
+
+from fastapi import APIRouter, Request, Depends
+from fastapi.responses import RedirectResponse
+
+from app.database import get_db
+from app.dependencies import get_current_user
+
+router = APIRouter()
+
+
+async def _render(request: Request, db, user, error: str | None = None):
+    from app.services.budgets import get_budget_status_async
+    from app.services.categories import get_categories_for_user_async
+    budgets = await get_budget_status_async(db, user.id, date.today().replace(day=1))
+    cats = await get_categories_for_user_async(db, user.id)
+    from app.main import app
+    return app.state.render_template(
+        request, "budgets/list.html", {"user": user, "budgets": budgets, "categories": cats, "error": error}
+    )
+
+
+@router.get("", name="budgets_list")
+async def budgets_list(request: Request, db=Depends(get_db), user=Depends(get_current_user)):
+    return await _render(request, db, user)
+
+
+@router.post("", name="budget_set")
+async def budget_set(request: Request, db=Depends(get_db), user=Depends(get_current_user)):
+    form = await request.form()
+    from app.csrf import validate_csrf_token
+    if not validate_csrf_token(form.get("csrf_token")):
+        return RedirectResponse(url="/budgets", status_code=303)
+    from app.services.budgets import set_budget_async
+    _, error = await set_budget_async(db, user.id, form.get("category_id"), form.get("amount"))
+    if error:
+        return await _render(request, db, user, error)
+    return RedirectResponse(url="/budgets", status_code=303)
+
+
+@router.post("/{budget_id}/delete", name="budget_delete")
+async def budget_delete(
+    request: Request, budget_id: int, db=Depends(get_db), user=Depends(get_current_user)
+):
+    form = await request.form()
+    from app.csrf import validate_csrf_token
+    if not validate_csrf_token(form.get("csrf_token")):
+        return RedirectResponse(url="/budgets", status_code=303)
+    from app.services.budgets import delete_budget_async
+    await delete_budget_async(db, user.id, budget_id)
+    return RedirectResponse(url="/budgets", status_code=303)
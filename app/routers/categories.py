@@ -10,8 +10,8 @@ router = APIRouter()
 
 @router.get("", name="categories_list")
 async def categories_list(request: Request, db=Depends(get_db), user=Depends(get_current_user)):
-    from app.services.categories import get_categories_for_user
-    cats = get_categories_for_user(db, user.id)
+    from app.services.categories import get_categories_for_user_async
+    cats = await get_categories_for_user_async(db, user.id)
     from app.main import app
     return app.state.render_template(
         request, "categories/list.html", {"user": user, "categories": cats}
@@ -25,11 +25,11 @@ async def category_create(request: Request, db=Depends(get_db), user=Depends(get
     if not validate_csrf_token(form.get("csrf_token")):
         return RedirectResponse(url="/categories", status_code=303)
     name = (form.get("name") or "").strip()
-    from app.services.categories import create_user_category
-    cat, error = create_user_category(db, user.id, name)
+    from app.services.categories import create_user_category_async
+    cat, error = await create_user_category_async(db, user.id, name)
     if error:
-        from app.services.categories import get_categories_for_user
-        cats = get_categories_for_user(db, user.id)
+        from app.services.categories import get_categories_for_user_async
+        cats = await get_categories_for_user_async(db, user.id)
         from app.main import app
         return app.state.render_template(
             request, "categories/list.html", {"user": user, "categories": cats, "error": error}
@@ -45,6 +45,6 @@ async def category_delete(
     from app.csrf import validate_csrf_token
     if not validate_csrf_token(form.get("csrf_token")):
         return RedirectResponse(url="/categories", status_code=303)
-    from app.services.categories import delete_user_category
-    delete_user_category(db, user.id, category_id)
+    from app.services.categories import delete_user_category_async
+    await delete_user_category_async(db, user.id, category_id)
     return RedirectResponse(url="/categories", status_code=303)
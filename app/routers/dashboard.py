@@ -1,27 +1,34 @@
 """Dashboard (home) routes."""
 from fastapi import APIRouter, Request, Depends
 
-from app.dependencies import get_current_user_optional
-from app.database import get_db
+from app.dependencies import get_current_user_optional, get_read_db
 
 router = APIRouter()
 
 
 @router.get("/dashboard", name="dashboard_page")
-async def dashboard_page(request: Request, db=Depends(get_db)):
+async def dashboard_page(request: Request, db=Depends(get_read_db)):
     from fastapi.responses import RedirectResponse
     user = await get_current_user_optional(request, db)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
-    from app.services.insights import get_monthly_summary
+    from app.http_cache import page_etag, not_modified, with_etag
+    from app.services.data_version import get_data_version_async
+    etag = page_etag(request, user.id, await get_data_version_async(db, user.id))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    from app.services.insights import get_period_insights_async, month_bounds
     from datetime import date
     today = date.today()
-    summary = get_monthly_summary(db, user.id, today.year, today.month)
-    from app.services.transactions import get_recent_transactions
-    recent = get_recent_transactions(db, user.id, limit=10)
+    summary = (await get_period_insights_async(db, user.id, *month_bounds(today.year, today.month)))["summary"]
+    from app.services.transactions import get_recent_transactions_async
+    recent = await get_recent_transactions_async(db, user.id, limit=10)
+    from app.services.budgets import get_budget_status_async
+    budgets = await get_budget_status_async(db, user.id, today.replace(day=1))
     from app.main import app
-    return app.state.render_template(
+    return with_etag(app.state.render_template(
         request,
         "dashboard.html",
-        {"user": user, "summary": summary, "recent_transactions": recent},
-    )
+        {"user": user, "summary": summary, "recent_transactions": recent, "budgets": budgets},
+    ), etag)
@@ -2,8 +2,7 @@
 from fastapi import APIRouter, Request, Depends, Query
 from datetime import date, timedelta
 
-from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_read_db, is_htmx_fragment
 
 router = APIRouter()
 
@@ -11,12 +10,18 @@ router = APIRouter()
 @router.get("", name="insights_page")
 async def insights_page(
     request: Request,
-    db=Depends(get_db),
+    db=Depends(get_read_db),
     user=Depends(get_current_user),
     period: str = Query("30", description="30, 6months, or custom"),
     date_from: str | None = None,
     date_to: str | None = None,
 ):
+    from app.http_cache import page_etag, not_modified, with_etag
+    from app.services.data_version import get_data_version_async
+    etag = page_etag(request, user.id, await get_data_version_async(db, user.id))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     today = date.today()
     if period == "6months":
         date_from_val = today - timedelta(days=180)
@@ -32,19 +37,60 @@ async def insights_page(
         date_from_val = today - timedelta(days=30)
         date_to_val = today
 
-    from app.services.insights import get_monthly_summary_range, get_category_breakdown
-    summary = get_monthly_summary_range(db, user.id, date_from_val, date_to_val)
-    breakdown = get_category_breakdown(db, user.id, date_from_val, date_to_val)
+    from app.services.insights import get_period_insights_async
+    insights = await get_period_insights_async(db, user.id, date_from_val, date_to_val)
+    fragment = is_htmx_fragment(request)
+    recurring = None
+    if not fragment:
+        # Independent of the period: only the full page shows it, period switches skip it
+        from app.services.recurring import detect_recurring_async
+        recurring = await detect_recurring_async(db, user.id, today)
     from app.main import app
-    return app.state.render_template(
+    return with_etag(app.state.render_template(
         request,
-        "insights/index.html",
+        "insights/body.html" if fragment else "insights/index.html",
         {
             "user": user,
-            "summary": summary,
-            "breakdown": breakdown,
+            "recurring": recurring,
+            "summary": insights["summary"],
+            "breakdown": insights["breakdown"],
             "period": period,
             "date_from": date_from_val.isoformat() if hasattr(date_from_val, "isoformat") else str(date_from_val),
             "date_to": date_to_val.isoformat() if hasattr(date_to_val, "isoformat") else str(date_to_val),
         },
-    )
+    ), etag)
+
+
+def _parse_date(value: str | None, default: date) -> date:
+    try:
+        return date.fromisoformat(value) if value else default
+    except ValueError:
+        return default
+
+
+@router.get("/trends", name="insights_trends")
+async def insights_trends(
+    request: Request,
+    db=Depends(get_read_db),
+    user=Depends(get_current_user),
+    granularity: str = Query("month", pattern="^(day|week|month)$"),
+    date_from: str | None = None,
+    date_to: str | None = None,
+    window: int = Query(3, ge=1, le=366, description="Buckets per moving average"),
+):
+    """Income, expense, net, running balance and moving averages per bucket, as JSON for charts."""
+    from fastapi.responses import JSONResponse
+    from app.http_cache import page_etag, not_modified, with_etag
+    from app.services.data_version import get_data_version_async
+    etag = page_etag(request, user.id, await get_data_version_async(db, user.id))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    today = date.today()
+    date_to_val = _parse_date(date_to, today)
+    date_from_val = _parse_date(date_from, date_to_val - timedelta(days=365))
+    if date_from_val > date_to_val:
+        date_from_val, date_to_val = date_to_val, date_from_val
+    from app.services.trends import get_trends_async
+    trends = await get_trends_async(db, user.id, granularity, date_from_val, date_to_val, window)
+    return with_etag(JSONResponse(trends), etag)
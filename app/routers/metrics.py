@@ -0,0 +1,21 @@
+"""Prometheus scrape endpoint."""
+import hmac
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from app.config import METRICS_TOKEN
+
+router = APIRouter()
+
+
+@router.get("/metrics", name="metrics", include_in_schema=False)
+async def metrics(request: Request):
+    # Disabled unless configured; a wrong token looks the same as no endpoint
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404)
+    supplied = request.headers.get("authorization", "")
+    if not hmac.compare_digest(supplied.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        raise HTTPException(status_code=404)
+    from app.metrics import render_prometheus
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -3,56 +3,145 @@ from fastapi import APIRouter, Request, Depends, Query
 from fastapi.responses import RedirectResponse
 
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_read_db, is_htmx_fragment, reads_from_primary
 
 router = APIRouter()
 
 
+def _int_or_none(value: str | None) -> int | None:
+    """Filter forms submit "" for "All"; treat that (or junk) as no filter."""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
 @router.get("", name="transactions_list")
 async def transactions_list(
     request: Request,
-    db=Depends(get_db),
+    db=Depends(get_read_db),
     user=Depends(get_current_user),
-    page: int = Query(1, ge=1),
+    page: int | None = Query(None, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
     date_from: str | None = None,
     date_to: str | None = None,
-    category_id: int | None = None,
+    category_id: str | None = None,
     type_filter: str | None = Query(None, alias="type"),
+    q: str | None = Query(None, max_length=200),
 ):
-    from app.services.transactions import list_transactions
-    from app.services.categories import get_categories_for_user
-    result = list_transactions(
+    from app.http_cache import page_etag, not_modified, with_etag
+    from app.services.data_version import get_data_version_async
+    etag = page_etag(request, user.id, await get_data_version_async(db, user.id))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    category_id = _int_or_none(category_id)
+    from app.services.transactions import list_transactions_async
+    from app.services.categories import get_categories_for_user_async
+    result = await list_transactions_async(
         db, user.id, page=page, per_page=per_page,
         date_from=date_from, date_to=date_to, category_id=category_id, type_filter=type_filter,
+        cursor=cursor, q=q,
     )
-    categories = get_categories_for_user(db, user.id)
+    categories = await get_categories_for_user_async(db, user.id)
     from app.main import app
-    return app.state.render_template(
+    return with_etag(app.state.render_template(
         request,
-        "transactions/list.html",
+        "transactions/list_fragment.html" if is_htmx_fragment(request) else "transactions/list.html",
         {
             "user": user,
             "transactions": result["items"],
             "total": result["total"],
-            "page": page,
+            "page": result["page"],
             "per_page": per_page,
             "total_pages": result["total_pages"],
+            "next_cursor": result["next_cursor"],
+            "prev_cursor": result["prev_cursor"],
             "categories": categories,
             "filters": {
                 "date_from": date_from,
                 "date_to": date_to,
                 "category_id": category_id,
                 "type": type_filter,
+                "q": q,
             },
         },
+    ), etag)
+
+
+@router.get("/export", name="transactions_export")
+async def transactions_export(
+    request: Request,
+    user=Depends(get_current_user),
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    date_from: str | None = None,
+    date_to: str | None = None,
+    category_id: str | None = None,
+    type_filter: str | None = Query(None, alias="type"),
+    q: str | None = Query(None, max_length=200),
+):
+    from fastapi.responses import StreamingResponse
+    from app.database import read_session_factories
+    from app.services.transactions import export_transactions
+    _, session_factory = read_session_factories(primary=reads_from_primary(request))
+    rows = export_transactions(
+        user.id, fmt,
+        date_from=date_from, date_to=date_to, category_id=_int_or_none(category_id), type_filter=type_filter,
+        q=q, session_factory=session_factory,
+    )
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        rows,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{fmt}"'},
+    )
+
+
+@router.get("/import", name="transactions_import")
+async def transactions_import(request: Request, db=Depends(get_db), user=Depends(get_current_user)):
+    from app.services.categories import get_categories_for_user_async
+    categories = await get_categories_for_user_async(db, user.id)
+    from app.main import app
+    return app.state.render_template(
+        request, "transactions/import.html", {"user": user, "categories": categories, "result": None}
+    )
+
+
+@router.post("/import", name="transactions_import_submit")
+async def transactions_import_submit(request: Request, db=Depends(get_db), user=Depends(get_current_user)):
+    form = await request.form()
+    from app.csrf import validate_csrf_token
+    if not validate_csrf_token(form.get("csrf_token")):
+        return RedirectResponse(url="/transactions/import", status_code=303)
+    from app.services.categories import get_categories_for_user_async
+    categories = await get_categories_for_user_async(db, user.id)
+    upload = form.get("file")
+    if not upload or not getattr(upload, "filename", None):
+        from app.main import app
+        return app.state.render_template(
+            request,
+            "transactions/import.html",
+            {"user": user, "categories": categories, "result": None, "error": "Choose a file to import."},
+        )
+    import io
+    from starlette.concurrency import run_in_threadpool
+    from app.services.imports import import_file
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", errors="replace", newline="")
+    result = await run_in_threadpool(
+        import_file, user.id, text, filename=upload.filename,
+        default_category=form.get("default_category") or "Other",
+    )
+    from app.main import app
+    return app.state.render_template(
+        request, "transactions/import.html", {"user": user, "categories": categories, "result": result}
     )
 
 
 @router.get("/new", name="transaction_new")
 async def transaction_new(request: Request, db=Depends(get_db), user=Depends(get_current_user)):
-    from app.services.categories import get_categories_for_user
-    categories = get_categories_for_user(db, user.id)
+    from app.services.categories import get_categories_for_user_async
+    categories = await get_categories_for_user_async(db, user.id)
     from app.main import app
     return app.state.render_template(
         request, "transactions/form.html", {"user": user, "categories": categories, "transaction": None}
@@ -65,8 +154,8 @@ async def transaction_create(request: Request, db=Depends(get_db), user=Depends(
     from app.csrf import validate_csrf_token
     if not validate_csrf_token(form.get("csrf_token")):
         return RedirectResponse(url="/transactions", status_code=303)
-    from app.services.transactions import create_transaction
-    trans, error = create_transaction(
+    from app.services.transactions import create_transaction_async
+    trans, error = await create_transaction_async(
         db,
         user_id=user.id,
         amount=form.get("amount"),
@@ -76,8 +165,8 @@ async def transaction_create(request: Request, db=Depends(get_db), user=Depends(
         transaction_date=form.get("transaction_date"),
     )
     if error:
-        from app.services.categories import get_categories_for_user
-        categories = get_categories_for_user(db, user.id)
+        from app.services.categories import get_categories_for_user_async
+        categories = await get_categories_for_user_async(db, user.id)
         from app.main import app
         return app.state.render_template(
             request,
@@ -91,13 +180,13 @@ async def transaction_create(request: Request, db=Depends(get_db), user=Depends(
 async def transaction_edit(
     request: Request, transaction_id: int, db=Depends(get_db), user=Depends(get_current_user)
 ):
-    from app.services.transactions import get_transaction
+    from app.services.transactions import get_transaction_async
     from fastapi.responses import RedirectResponse
-    trans = get_transaction(db, user.id, transaction_id)
+    trans = await get_transaction_async(db, user.id, transaction_id)
     if not trans:
         return RedirectResponse(url="/transactions", status_code=303)
-    from app.services.categories import get_categories_for_user
-    categories = get_categories_for_user(db, user.id)
+    from app.services.categories import get_categories_for_user_async
+    categories = await get_categories_for_user_async(db, user.id)
     from app.main import app
     return app.state.render_template(
         request,
@@ -114,8 +203,8 @@ async def transaction_update(
     from app.csrf import validate_csrf_token
     if not validate_csrf_token(form.get("csrf_token")):
         return RedirectResponse(url="/transactions", status_code=303)
-    from app.services.transactions import update_transaction
-    trans, error = update_transaction(
+    from app.services.transactions import update_transaction_async
+    trans, error = await update_transaction_async(
         db,
         user_id=user.id,
         transaction_id=transaction_id,
@@ -126,10 +215,10 @@ async def transaction_update(
         transaction_date=form.get("transaction_date"),
     )
     if error:
-        from app.services.transactions import get_transaction
-        from app.services.categories import get_categories_for_user
-        trans = get_transaction(db, user.id, transaction_id)
-        categories = get_categories_for_user(db, user.id)
+        from app.services.transactions import get_transaction_async
+        from app.services.categories import get_categories_for_user_async
+        trans = await get_transaction_async(db, user.id, transaction_id)
+        categories = await get_categories_for_user_async(db, user.id)
         from app.main import app
         return app.state.render_template(
             request,
@@ -147,6 +236,6 @@ async def transaction_delete(
     from app.csrf import validate_csrf_token
     if not validate_csrf_token(form.get("csrf_token")):
         return RedirectResponse(url="/transactions", status_code=303)
-    from app.services.transactions import soft_delete_transaction
-    soft_delete_transaction(db, user.id, transaction_id)
+    from app.services.transactions import soft_delete_transaction_async
+    await soft_delete_transaction_async(db, user.id, transaction_id)
     return RedirectResponse(url="/transactions", status_code=303)
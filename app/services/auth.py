@@ -1,4 +1,7 @@
 """Authentication service: password hashing, JWT, register, login."""
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import bcrypt
@@ -6,8 +9,12 @@ from jose import jwt
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from app.config import SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRE_HOURS
+from app.config import (
+    SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRE_HOURS,
+    BCRYPT_ROUNDS, HASH_POOL, HASH_WORKERS, HASH_QUEUE_SIZE,
+)
 from app.models import User
+from app.database import run_db
 
 # Bcrypt accepts at most 72 bytes; we truncate before calling to avoid any library raising.
 MAX_PASSWORD_BYTES = 72
@@ -19,9 +26,9 @@ def _password_bytes(password: str) -> bytes:
     return b[:MAX_PASSWORD_BYTES]
 
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, rounds: int | None = None) -> str:
     pw_bytes = _password_bytes(password)
-    hashed = bcrypt.hashpw(pw_bytes, bcrypt.gensalt())
+    hashed = bcrypt.hashpw(pw_bytes, bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS))
     return hashed.decode("utf-8")
 
 
@@ -34,34 +41,140 @@ def verify_password(plain: str, hashed: str) -> bool:
         return False
 
 
+def needs_rehash(hashed: str) -> bool:
+    """True if the hash was made with a bcrypt cost other than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+
+class HashPoolBusy(Exception):
+    """The password hashing pool is saturated; the caller should ask the client to retry."""
+
+
+_pool: Executor | None = None
+_pool_lock = threading.Lock()
+_in_flight = 0
+
+
+def _get_pool() -> Executor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            cls = ProcessPoolExecutor if HASH_POOL == "process" else ThreadPoolExecutor
+            _pool = cls(max_workers=HASH_WORKERS)
+        return _pool
+
+
+async def _run_in_hash_pool(fn, *args):
+    """Run fn in the hash pool; raise HashPoolBusy when workers and queue are all taken."""
+    global _in_flight
+    with _pool_lock:
+        if _in_flight >= HASH_WORKERS + HASH_QUEUE_SIZE:
+            raise HashPoolBusy()
+        _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), fn, *args)
+    finally:
+        with _pool_lock:
+            _in_flight -= 1
+
+
+def hash_pool_in_flight() -> int:
+    """bcrypt jobs currently running or queued (for metrics)."""
+    return _in_flight
+
+
+async def hash_password_async(password: str) -> str:
+    # Cost is passed explicitly so process-pool workers match this process's setting
+    return await _run_in_hash_pool(hash_password, password, BCRYPT_ROUNDS)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain, hashed)
+
+
 def create_access_token(user_id: int) -> str:
     expire = datetime.utcnow() + timedelta(hours=JWT_EXPIRE_HOURS)
     payload = {"sub": str(user_id), "exp": expire}
     return jwt.encode(payload, SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 
-def register_user(db: Session, email: str, password: str) -> tuple[User | None, str | None]:
-    """Register a new user. Returns (user, None) or (None, error_message)."""
+def _validate_registration(email: str, password: str) -> str | None:
     if not email or "@" not in email:
-        return None, "Invalid email."
+        return "Invalid email."
     if not password or len(password) < 8:
-        return None, "Password must be at least 8 characters."
-    existing = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
-    if existing:
-        return None, "Email already registered."
+        return "Password must be at least 8 characters."
+    return None
+
+
+def get_user_by_email(db: Session, email: str) -> User | None:
+    return db.execute(select(User).where(User.email == email)).scalar_one_or_none()
+
+
+def _create_user(db: Session, email: str, hashed_password: str) -> User:
     user = User(
         email=email,
-        hashed_password=hash_password(password),
+        hashed_password=hashed_password,
     )
     db.add(user)
     db.commit()
     db.refresh(user)
-    return user, None
+    return user
+
+
+def _set_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    from app.dependencies import invalidate_user
+    user.hashed_password = hashed_password
+    db.commit()
+    invalidate_user(user.id)
+
+
+def register_user(db: Session, email: str, password: str) -> tuple[User | None, str | None]:
+    """Register a new user. Returns (user, None) or (None, error_message)."""
+    error = _validate_registration(email, password)
+    if error:
+        return None, error
+    if get_user_by_email(db, email):
+        return None, "Email already registered."
+    return _create_user(db, email, hash_password(password)), None
 
 
 def authenticate_user(db: Session, email: str, password: str) -> User | None:
     """Return user if credentials are valid."""
-    user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
+    user = get_user_by_email(db, email)
     if not user or not verify_password(password, user.hashed_password):
         return None
+    if needs_rehash(user.hashed_password):
+        _set_password_hash(db, user, hash_password(password))
+    return user
+
+
+async def register_user_async(db, email: str, password: str) -> tuple[User | None, str | None]:
+    """Async register_user with bcrypt in the hash pool. May raise HashPoolBusy."""
+    error = _validate_registration(email, password)
+    if error:
+        return None, error
+    if await run_db(db, get_user_by_email, email):
+        return None, "Email already registered."
+    hashed = await hash_password_async(password)
+    return await run_db(db, _create_user, email, hashed), None
+
+
+async def authenticate_user_async(db, email: str, password: str) -> User | None:
+    """Async authenticate_user with bcrypt in the hash pool. May raise HashPoolBusy.
+
+    Hashes made with an old cost are upgraded on successful login; the upgrade is
+    skipped (and retried next login) if the pool is busy.
+    """
+    user = await run_db(db, get_user_by_email, email)
+    if not user or not await verify_password_async(password, user.hashed_password):
+        return None
+    if needs_rehash(user.hashed_password):
+        try:
+            hashed = await hash_password_async(password)
+        except HashPoolBusy:
+            return user
+        await run_db(db, _set_password_hash, user, hashed)
     return user
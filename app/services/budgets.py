@@ -0,0 +1,117 @@
+"""Budget service: monthly category limits and month-to-date spend against them.
+
+Spend is read from monthly_rollups, which the transaction write services and the
+importer keep current by applying deltas, so evaluating all of a user's budgets is one
+join on the rollup key (user, month) instead of a SUM over the month per budget.
+scripts/rollups.py reconcile repairs drift. Results are cached under the user's data
+version, so repeat views between writes cost no queries.
+"""
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.database import async_service
+from app.models import Budget, MonthlyRollup
+from app.models.transaction import TransactionType
+from app.services.categories import get_category_for_user, get_user_categories
+from app.services.data_version import bump_data_version, cached_per_version
+from app.services.transactions import _parse_amount
+
+
+@dataclass(frozen=True, slots=True)
+class BudgetStatus:
+    """A budget and its month-to-date spend, safe to share between requests."""
+    id: int
+    category_id: int
+    category_name: str
+    amount: Decimal
+    spent: Decimal
+
+    @property
+    def remaining(self) -> Decimal:
+        return self.amount - self.spent
+
+    @property
+    def percent(self) -> float:
+        return round(float(self.spent) / float(self.amount) * 100, 1) if self.amount else 0.0
+
+    @property
+    def over(self) -> bool:
+        return self.spent > self.amount
+
+
+@cached_per_version()
+def get_budget_status(db: Session, user_id: int, month: date) -> list[BudgetStatus]:
+    """Every budget of the user with its spend in the month (any day of it), by category name."""
+    month = month.replace(day=1)
+    rows = db.execute(
+        select(Budget.id, Budget.category_id, Budget.amount, MonthlyRollup.total)
+        .outerjoin(MonthlyRollup, and_(
+            MonthlyRollup.user_id == Budget.user_id,
+            MonthlyRollup.month == month,
+            MonthlyRollup.category_id == Budget.category_id,
+            MonthlyRollup.type == TransactionType.expense,
+        ))
+        .where(Budget.user_id == user_id)
+    ).all()
+    names = get_user_categories(db, user_id).by_id
+    items = [
+        BudgetStatus(
+            id=r.id,
+            category_id=r.category_id,
+            category_name=names[r.category_id].name,
+            amount=Decimal(str(r.amount)).quantize(Decimal("0.01")),
+            spent=Decimal(str(r.total or 0)).quantize(Decimal("0.01")),
+        )
+        for r in rows
+        # A budget can outlive its category where the database does not cascade (SQLite)
+        if r.category_id in names
+    ]
+    items.sort(key=lambda b: b.category_name.lower())
+    return items
+
+
+def set_budget(
+    db: Session, user_id: int, category_id: str | None, amount: str | None
+) -> tuple[Budget | None, str | None]:
+    """Create the category's budget, or change its amount if it has one."""
+    amount_val = _parse_amount(amount)
+    if amount_val is None or not amount_val.is_finite() or amount_val <= 0:
+        return None, "Budget must be a positive number."
+    try:
+        cat_id = int(category_id) if category_id else None
+    except (TypeError, ValueError):
+        cat_id = None
+    if not cat_id or not get_category_for_user(db, user_id, cat_id):
+        return None, "Invalid category."
+    budget = db.execute(
+        select(Budget).where(Budget.user_id == user_id, Budget.category_id == cat_id)
+    ).scalar_one_or_none()
+    if budget is None:
+        budget = Budget(user_id=user_id, category_id=cat_id, amount=amount_val)
+        db.add(budget)
+    else:
+        budget.amount = amount_val
+    bump_data_version(db, user_id)
+    db.commit()
+    db.refresh(budget)
+    return budget, None
+
+
+def delete_budget(db: Session, user_id: int, budget_id: int) -> bool:
+    budget = db.get(Budget, budget_id)
+    if not budget or budget.user_id != user_id:
+        return False
+    db.delete(budget)
+    bump_data_version(db, user_id)
+    db.commit()
+    return True
+
+
+# Async twins for request handlers
+get_budget_status_async = async_service(get_budget_status)
+set_budget_async = async_service(set_budget)
+delete_budget_async = async_service(delete_budget)
@@ -1,9 +1,14 @@
 """Category service: predefined seed, list, create (with duplicate check), delete."""
+from dataclasses import dataclass
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import select, or_
+from sqlalchemy import delete, insert, select, or_
 
-from app.models import Category, User
+from app.cache import TTLCache
+from app.config import CATEGORY_CACHE_SIZE, CATEGORY_CACHE_TTL
+from app.models import Budget, Category, User
+from app.database import async_service
+from app.services.data_version import bump_data_version, get_data_version, version_key
 
 PREDEFINED_NAMES = [
     "Food", "Transport", "Salary", "Rent", "Utilities",
@@ -11,29 +16,82 @@ PREDEFINED_NAMES = [
 ]
 
 
-def seed_predefined_categories(db: Session) -> None:
-    """Create predefined categories if they don't exist (user_id=None)."""
-    for name in PREDEFINED_NAMES:
-        existing = db.execute(
-            select(Category).where(
-                Category.user_id.is_(None),
-                Category.name == name,
-            )
-        ).scalar_one_or_none()
-        if not existing:
-            db.add(Category(name=name, user_id=None, is_predefined=True))
-    db.commit()
+def seed_predefined_categories(db: Session) -> int:
+    """Create missing predefined categories (user_id=None): one SELECT, one bulk INSERT.
+
+    Returns how many were created. Concurrent callers must serialise (app.startup.init_lock).
+    """
+    existing = set(db.execute(
+        select(Category.name).where(Category.user_id.is_(None), Category.name.in_(PREDEFINED_NAMES))
+    ).scalars())
+    missing = [name for name in PREDEFINED_NAMES if name not in existing]
+    if missing:
+        db.execute(insert(Category), [{"name": name, "user_id": None, "is_predefined": True} for name in missing])
+        db.commit()
+        category_cache.clear()
+    return len(missing)
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryInfo:
+    """Session-independent snapshot of a category, safe to share between requests."""
+    id: int
+    name: str
+    user_id: int | None
+    is_predefined: bool
+
+
+@dataclass(frozen=True, slots=True)
+class UserCategories:
+    items: list[CategoryInfo]
+    by_id: dict[int, CategoryInfo]
+
+
+# user_id -> (data version, UserCategories) for predefined + own categories. Category
+# writes bump the user's data version, so an entry cached under an older version is a
+# miss in every worker (within DATA_VERSION_TTL), not only in the one that wrote.
+category_cache = TTLCache(maxsize=CATEGORY_CACHE_SIZE, ttl=CATEGORY_CACHE_TTL)
 
 
-def get_categories_for_user(db: Session, user_id: int) -> list[Category]:
+def invalidate_user_categories(user_id: int) -> None:
+    category_cache.pop(user_id)
+    category_cache.pop(("replica", user_id))
+
+
+def get_user_categories(db: Session, user_id: int) -> UserCategories:
+    """Cached predefined + user's own categories with an id index."""
+    key = version_key(db, user_id)
+    version = get_data_version(db, user_id)
+    cached = category_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    rows = db.execute(
+        select(Category.id, Category.name, Category.user_id, Category.is_predefined)
+        .where(or_(Category.user_id.is_(None), Category.user_id == user_id))
+        .order_by(Category.name)
+    ).all()
+    items = [CategoryInfo(r.id, r.name, r.user_id, bool(r.is_predefined)) for r in rows]
+    entry = UserCategories(items=items, by_id={c.id: c for c in items})
+    category_cache.set(key, (version, entry))
+    return entry
+
+
+def get_categories_for_user(db: Session, user_id: int) -> list[CategoryInfo]:
     """Predefined + user's own categories, ordered by name."""
-    return list(
-        db.execute(
-            select(Category)
-            .where(or_(Category.user_id.is_(None), Category.user_id == user_id))
-            .order_by(Category.name)
-        ).scalars().all()
-    )
+    return get_user_categories(db, user_id).items
+
+
+def get_category_for_user(db: Session, user_id: int, category_id: int) -> CategoryInfo | None:
+    """A category the user may use (predefined or own), or None."""
+    cat = get_user_categories(db, user_id).by_id.get(category_id)
+    if cat is not None:
+        return cat
+    # Not in the cached set: may have been created by another worker since we cached
+    row = db.get(Category, category_id)
+    if not row or (row.user_id is not None and row.user_id != user_id):
+        return None
+    invalidate_user_categories(user_id)
+    return get_user_categories(db, user_id).by_id.get(category_id)
 
 
 def create_user_category(db: Session, user_id: int, name: str) -> tuple[Category | None, str | None]:
@@ -51,8 +109,10 @@ def create_user_category(db: Session, user_id: int, name: str) -> tuple[Category
         return None, f"A category named '{name}' already exists."
     cat = Category(user_id=user_id, name=name, is_predefined=False)
     db.add(cat)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(cat)
+    invalidate_user_categories(user_id)
     return cat, None
 
 
@@ -61,6 +121,16 @@ def delete_user_category(db: Session, user_id: int, category_id: int) -> bool:
     cat = db.get(Category, category_id)
     if not cat or cat.user_id != user_id:
         return False
+    # Explicit: SQLite does not enforce the foreign key cascade
+    db.execute(delete(Budget).where(Budget.category_id == category_id))
     db.delete(cat)
+    bump_data_version(db, user_id)
     db.commit()
+    invalidate_user_categories(user_id)
     return True
+
+
+# Async twins for request handlers
+get_categories_for_user_async = async_service(get_categories_for_user)
+create_user_category_async = async_service(create_user_category)
+delete_user_category_async = async_service(delete_user_category)
@@ -0,0 +1,121 @@
+"""Per-user data version: bumped by writes, keys the result cache and page ETags."""
+import functools
+import threading
+from collections.abc import Callable
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.config import DATA_VERSION_TTL, RESULT_CACHE_SIZE
+from app.database import run_db
+from app.models import User
+
+# user_id -> data_version
+version_cache = TTLCache(maxsize=100_000, ttl=DATA_VERSION_TTL)
+# (function, user_id, version, args) -> result. Old versions simply age out of the LRU.
+result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE)
+
+# Committed bumps seen by this process: per user, and for all users. A version read that
+# overlaps a commit is not cached (see get_data_version).
+_invalidations: dict[int, int] = {}
+_all_invalidations = 0
+_invalidation_lock = threading.Lock()
+
+
+def bump_data_version(db: Session, user_id: int) -> None:
+    """Increment the user's data version in the current DB transaction. Does not commit."""
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.info.setdefault("bumped_users", set()).add(user_id)
+    version_cache.pop(user_id)
+
+
+def bump_all_data_versions(db: Session) -> None:
+    """Increment every user's data version (bulk rebuilds). Does not commit."""
+    db.execute(
+        update(User)
+        .values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.info["bumped_all_users"] = True
+    version_cache.clear()
+
+
+def version_key(db, user_id: int):
+    """Cache key of the user's version as seen by db's engine.
+
+    A replica's version can lag the primary's. It is cached apart, so data read from a
+    replica is only ever cached under the version that replica had (its entry ages out by TTL).
+    """
+    return ("replica", user_id) if db.info.get("replica") else user_id
+
+
+def _invalidation_stamp(user_id: int) -> tuple[int, int]:
+    return _all_invalidations, _invalidations.get(user_id, 0)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_committed_versions(session: Session) -> None:
+    global _all_invalidations
+    with _invalidation_lock:
+        for user_id in session.info.pop("bumped_users", ()):
+            _invalidations[user_id] = _invalidations.get(user_id, 0) + 1
+            version_cache.pop(user_id)
+        if session.info.pop("bumped_all_users", False):
+            _all_invalidations += 1
+            version_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bumps(session: Session) -> None:
+    session.info.pop("bumped_users", None)
+    session.info.pop("bumped_all_users", None)
+
+
+def get_data_version(db: Session, user_id: int) -> int:
+    key = version_key(db, user_id)
+    version = version_cache.get(key)
+    if version is None:
+        with _invalidation_lock:
+            stamp = _invalidation_stamp(user_id)
+        version = db.execute(select(User.data_version).where(User.id == user_id)).scalar() or 0
+        # A bump committed meanwhile may not be in what was read; caching it would keep the
+        # old version for DATA_VERSION_TTL after the after-commit drop. Use it uncached.
+        with _invalidation_lock:
+            if _invalidation_stamp(user_id) == stamp:
+                version_cache.set(key, version)
+    return version
+
+
+def cached_per_version(snapshot: Callable | None = None) -> Callable:
+    """Cache a service function fn(db, user_id, ...) under the user's data version.
+
+    snapshot converts the result into something safe to share between sessions.
+    Cached results are shared: callers must not mutate them.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(db: Session, user_id: int, *args, **kwargs):
+            key = (fn.__qualname__, user_id, get_data_version(db, user_id), args, tuple(sorted(kwargs.items())))
+            result = result_cache.get(key)
+            if result is None:
+                result = fn(db, user_id, *args, **kwargs)
+                if snapshot is not None:
+                    result = snapshot(result)
+                result_cache.set(key, result)
+            return result
+        return wrapper
+    return decorator
+
+
+async def get_data_version_async(db, user_id: int) -> int:
+    """Async get_data_version; a cache hit returns without touching the session."""
+    version = version_cache.get(version_key(db, user_id))
+    if version is not None:
+        return version
+    return await run_db(db, get_data_version, user_id)
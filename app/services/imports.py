@@ -0,0 +1,196 @@
+"""Import service: incremental CSV/OFX parsing and batched transaction inserts."""
+import csv
+import re
+from collections.abc import Iterable, Iterator
+from decimal import Decimal
+from typing import IO
+
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+
+from app.config import IMPORT_BATCH_SIZE
+from app.database import SessionLocal, mark_bulk_queries, statement_timeout
+from app.models import Transaction
+from app.models.transaction import TransactionType
+from app.services import rollups, search
+from app.services.categories import get_user_categories
+from app.services.data_version import bump_data_version
+from app.services.transactions import _parse_amount, _parse_date
+
+# Keep error reports bounded on badly malformed files
+MAX_REPORTED_ERRORS = 1000
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[tuple[int, dict]]:
+    """Yield (line number, row) from CSV text with a header row.
+
+    Recognised columns (case-insensitive): date, type, category, amount, description.
+    The layout written by the export endpoint imports as-is.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    keys = [h.strip().lower() for h in header]
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        yield reader.line_num, dict(zip(keys, row))
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def parse_ofx(lines: Iterable[str]) -> Iterator[tuple[int, dict]]:
+    """Yield (line number, row) for each STMTTRN in an OFX/QFX file (SGML or XML).
+
+    Signed TRNAMT maps to type (negative = expense). OFX has no categories, so rows
+    carry none and fall back to the importer's default category.
+    """
+    current: dict | None = None
+    start = 0
+    for lineno, line in enumerate(lines, start=1):
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing:
+                    if current is not None:
+                        yield start, _ofx_row(current)
+                    current = None
+                else:
+                    current, start = {}, lineno
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+
+
+def _ofx_row(fields: dict) -> dict:
+    posted = fields.get("DTPOSTED", "")[:8]
+    date_iso = f"{posted[:4]}-{posted[4:6]}-{posted[6:8]}" if len(posted) == 8 else posted
+    description = fields.get("NAME") or fields.get("MEMO") or ""
+    if fields.get("NAME") and fields.get("MEMO"):
+        description = f"{fields['NAME']} {fields['MEMO']}"
+    return {"date": date_iso, "amount": fields.get("TRNAMT", ""), "description": description}
+
+
+def detect_format(filename: str | None, first_line: str) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ofx", ".qfx")) or first_line.lstrip().upper().startswith(("OFXHEADER", "<OFX", "<?XML")):
+        return "ofx"
+    return "csv"
+
+
+def import_rows(
+    db: Session,
+    user_id: int,
+    rows: Iterable[tuple[int, dict]],
+    default_category: str | None = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> dict:
+    """Validate and insert parsed rows in executemany batches, one commit per batch.
+
+    Returns {"imported": n, "errors": [(line, message), ...]}. Invalid rows are skipped;
+    valid rows in the same batch are still inserted. Rollups get one delta per
+    (month, category, type) per batch; on SQLite the search index gets one insert.
+    """
+    mark_bulk_queries()
+    by_name = {c.name.lower(): c.id for c in get_user_categories(db, user_id).items}
+    default_cat_id = by_name.get(default_category.lower()) if default_category else None
+    imported = 0
+    errors: list[tuple[int, str]] = []
+    batch: list[dict] = []
+
+    def flush() -> None:
+        nonlocal imported
+        if not batch:
+            return
+        # Each batch is its own transaction, so the timeout is set per batch
+        statement_timeout(db, "bulk")
+        if search.needs_sync(db):
+            ids = db.execute(
+                insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True), batch
+            ).scalars().all()
+            search.index_rows(db, user_id, zip(ids, (r["description"] for r in batch)))
+        else:
+            db.execute(insert(Transaction), batch)
+        deltas: dict[tuple, list] = {}
+        for r in batch:
+            key = (r["transaction_date"].replace(day=1), r["category_id"], r["type"])
+            acc = deltas.setdefault(key, [Decimal("0"), 0])
+            acc[0] += r["amount"]
+            acc[1] += 1
+        for (month, cat_id, type_), (total, count) in deltas.items():
+            rollups.apply_delta(db, user_id, month, cat_id, type_, total, count)
+        bump_data_version(db, user_id)
+        db.commit()
+        imported += len(batch)
+        batch.clear()
+
+    def error(line: int, message: str) -> None:
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append((line, message))
+
+    for line, row in rows:
+        amount = _parse_amount(row.get("amount"))
+        if amount is not None and not amount.is_finite():
+            error(line, "Amount must be a positive number.")
+            continue
+        raw_type = (row.get("type") or "").strip().lower()
+        if amount is not None and not raw_type:
+            if amount < 0:
+                amount, raw_type = -amount, TransactionType.expense.value
+            elif "type" not in row:
+                # Signed formats without a type column (OFX, many bank exports): positive is income
+                raw_type = TransactionType.income.value
+        if amount is None or amount <= 0:
+            error(line, "Amount must be a positive number.")
+            continue
+        try:
+            type_enum = TransactionType(raw_type) if raw_type else TransactionType.expense
+        except ValueError:
+            error(line, "Type must be income or expense.")
+            continue
+        date_val = _parse_date(row.get("date"))
+        if not date_val:
+            error(line, "Transaction date is required.")
+            continue
+        cat_name = (row.get("category") or "").strip()
+        cat_id = by_name.get(cat_name.lower()) if cat_name else default_cat_id
+        if not cat_id:
+            error(line, f"Unknown category '{cat_name}'." if cat_name else "Category is required.")
+            continue
+        batch.append({
+            "user_id": user_id,
+            "amount": amount,
+            "type": type_enum,
+            "category_id": cat_id,
+            "description": (row.get("description") or "").strip()[:500] or None,
+            "transaction_date": date_val,
+        })
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return {"imported": imported, "errors": errors}
+
+
+def import_file(
+    user_id: int,
+    text: IO[str],
+    filename: str | None = None,
+    fmt: str | None = None,
+    default_category: str | None = "Other",
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> dict:
+    """Import a CSV or OFX text stream for a user, reading it incrementally.
+
+    Opens its own session so callers can run it in a worker thread.
+    """
+    first = text.readline()
+    fmt = fmt or detect_format(filename, first)
+
+    def lines() -> Iterator[str]:
+        yield first
+        yield from text
+
+    parsed = parse_ofx(lines()) if fmt == "ofx" else parse_csv(lines())
+    with SessionLocal() as db:
+        return import_rows(db, user_id, parsed, default_category=default_category, batch_size=batch_size)
@@ -1,51 +1,93 @@
 """Insights service: monthly summary, category breakdown, date range summary."""
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select, func, or_, case, union_all
 
-from app.models import Transaction
+from app.models import Transaction, MonthlyRollup
 from app.models.transaction import TransactionType
+from app.database import async_service, statement_timeout
+from app.services.categories import get_user_categories
+from app.services.data_version import cached_per_version
+
+
+def month_bounds(year: int, month: int) -> tuple[date, date]:
+    """First and last day of a month."""
+    from calendar import monthrange
+    _, last = monthrange(year, month)
+    return date(year, month, 1), date(year, month, last)
 
 
 def get_monthly_summary(
     db: Session, user_id: int, year: int, month: int
 ) -> dict:
     """Summary for a single month: income, expenses, net, savings_rate."""
-    from calendar import monthrange
-    start = date(year, month, 1)
-    _, last = monthrange(year, month)
-    end = date(year, month, last)
+    start, end = month_bounds(year, month)
     return get_monthly_summary_range(db, user_id, start, end)
 
 
-def get_monthly_summary_range(
-    db: Session, user_id: int, date_from: date, date_to: date
-) -> dict:
-    """Summary for a date range: total income, total expenses, net, savings_rate."""
-    q_income = (
-        select(func.coalesce(func.sum(Transaction.amount), 0))
-        .where(
-            Transaction.user_id == user_id,
-            Transaction.deleted_at.is_(None),
-            Transaction.type == TransactionType.income,
-            Transaction.transaction_date >= date_from,
-            Transaction.transaction_date <= date_to,
+def _next_month(d: date) -> date:
+    return date(d.year + 1, 1, 1) if d.month == 12 else date(d.year, d.month + 1, 1)
+
+
+def _split_range(date_from: date, date_to: date) -> tuple[date | None, date | None, list[tuple[date, date]]]:
+    """Split a range into whole months (first, last month start) and partial edge ranges."""
+    first = date_from if date_from.day == 1 else _next_month(date_from)
+    to_month = date_to.replace(day=1)
+    if _next_month(date_to) - timedelta(days=1) == date_to:
+        last = to_month
+    else:
+        last = (to_month - timedelta(days=1)).replace(day=1)
+    if first > last:
+        return None, None, [(date_from, date_to)] if date_from <= date_to else []
+    edges = []
+    if date_from < first:
+        edges.append((date_from, first - timedelta(days=1)))
+    if date_to >= _next_month(last):
+        edges.append((_next_month(last), date_to))
+    return first, last, edges
+
+
+def _period_rows(db: Session, user_id: int, date_from: date, date_to: date):
+    """(category_id, type, amount) rows covering the range: whole-month rollups plus raw edge days."""
+    first, last, edges = _split_range(date_from, date_to)
+    parts = []
+    if first is not None:
+        parts.append(
+            select(
+                MonthlyRollup.category_id.label("category_id"),
+                MonthlyRollup.type.label("type"),
+                MonthlyRollup.total.label("amount"),
+            ).where(
+                MonthlyRollup.user_id == user_id,
+                MonthlyRollup.month >= first,
+                MonthlyRollup.month <= last,
+            )
         )
-    )
-    q_expense = (
-        select(func.coalesce(func.sum(Transaction.amount), 0))
-        .where(
-            Transaction.user_id == user_id,
-            Transaction.deleted_at.is_(None),
-            Transaction.type == TransactionType.expense,
-            Transaction.transaction_date >= date_from,
-            Transaction.transaction_date <= date_to,
+    if edges:
+        parts.append(
+            select(
+                Transaction.category_id.label("category_id"),
+                Transaction.type.label("type"),
+                Transaction.amount.label("amount"),
+            ).where(
+                Transaction.user_id == user_id,
+                Transaction.deleted_at.is_(None),
+                or_(*(Transaction.transaction_date.between(a, b) for a, b in edges)),
+            )
         )
-    )
-    income = db.execute(q_income).scalar() or Decimal("0")
-    expenses = db.execute(q_expense).scalar() or Decimal("0")
+    if not parts:
+        return None
+    return (parts[0] if len(parts) == 1 else union_all(*parts)).subquery()
+
+
+def _money(v) -> Decimal:
+    """Normalize a SQL sum (Decimal, or float on SQLite) to cents."""
+    return Decimal(str(v or 0)).quantize(Decimal("0.01"))
+
+
+def _summary(income: Decimal, expenses: Decimal) -> dict:
     net = income - expenses
     rate = (float(net) / float(income) * 100) if income and income > 0 else Decimal("0")
     return {
@@ -56,34 +98,67 @@ def get_monthly_summary_range(
     }
 
 
-def get_category_breakdown(
+@cached_per_version()
+def get_period_insights(
     db: Session, user_id: int, date_from: date, date_to: date
-) -> list[dict]:
-    """Per-category totals (expenses only) and % of total spending."""
-    from app.models import Category
+) -> dict:
+    """Summary and expense breakdown for a range in one grouped query.
+
+    Category names come from the per-user category cache. Results are cached under the
+    user's data version, so repeat views between writes cost no queries.
+
+    Returns {"summary": ..., "breakdown": [...]} with the same shapes as
+    get_monthly_summary_range and get_category_breakdown.
+    """
+    src = _period_rows(db, user_id, date_from, date_to)
+    if src is None:
+        return {"summary": _summary(Decimal("0"), Decimal("0")), "breakdown": []}
+    statement_timeout(db, "report")
     q = (
-        select(Transaction.category_id, func.sum(Transaction.amount).label("total"))
-        .where(
-            Transaction.user_id == user_id,
-            Transaction.deleted_at.is_(None),
-            Transaction.type == TransactionType.expense,
-            Transaction.transaction_date >= date_from,
-            Transaction.transaction_date <= date_to,
+        select(
+            src.c.category_id,
+            func.sum(case((src.c.type == TransactionType.income, src.c.amount), else_=0)).label("income"),
+            func.sum(case((src.c.type == TransactionType.expense, src.c.amount), else_=0)).label("expense"),
         )
-        .group_by(Transaction.category_id)
+        .select_from(src)
+        .group_by(src.c.category_id)
     )
     rows = db.execute(q).all()
-    total_expenses = sum(r.total for r in rows)
-    result = []
+    names = get_user_categories(db, user_id).by_id
+    income = sum((_money(r.income) for r in rows), Decimal("0"))
+    expenses = sum((_money(r.expense) for r in rows), Decimal("0"))
+    breakdown = []
     for r in rows:
-        cat = db.get(Category, r.category_id)
-        name = cat.name if cat else "Unknown"
-        pct = (float(r.total) / float(total_expenses) * 100) if total_expenses else 0
-        result.append({
+        total = _money(r.expense)
+        if not total:
+            continue
+        pct = (float(total) / float(expenses) * 100) if expenses else 0
+        breakdown.append({
             "category_id": r.category_id,
-            "category_name": name,
-            "total": r.total,
+            "category_name": names[r.category_id].name if r.category_id in names else "Unknown",
+            "total": total,
             "percent": round(pct, 1),
         })
-    result.sort(key=lambda x: -float(x["total"]))
-    return result
+    breakdown.sort(key=lambda x: -float(x["total"]))
+    return {"summary": _summary(income, expenses), "breakdown": breakdown}
+
+
+def get_monthly_summary_range(
+    db: Session, user_id: int, date_from: date, date_to: date
+) -> dict:
+    """Summary for a date range: total income, total expenses, net, savings_rate."""
+    return get_period_insights(db, user_id, date_from, date_to)["summary"]
+
+
+def get_category_breakdown(
+    db: Session, user_id: int, date_from: date, date_to: date
+) -> list[dict]:
+    """Per-category totals (expenses only) and % of total spending."""
+    return get_period_insights(db, user_id, date_from, date_to)["breakdown"]
+
+
+# Async twins for request handlers
+get_monthly_summary_async = async_service(get_monthly_summary)
+get_monthly_summary_range_async = async_service(get_monthly_summary_range)
+get_category_breakdown_async = async_service(get_category_breakdown)
+get_period_insights_async = async_service(get_period_insights)
@@ -0,0 +1,251 @@
+"""Recurring transaction detection: subscriptions, rent, salary and other regular payments.
+
+A user's history is loaded as column arrays (one query, no ORM objects) and grouped
+by (type, normalized description). Per-group interval statistics are computed with
+NumPy over the whole history at once: sort by (group, date), diff, then bincount and
+sorted-offset medians per group. A group is recurring when its median interval is
+close to a known period and most intervals agree with it. Groups that fail are
+regrouped with an amount bucket as well, which finds a fixed-price subscription
+hidden among other payments with the same description.
+"""
+import calendar
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import Float, Integer, case, cast, func, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.database import async_service, statement_timeout
+from app.models import Transaction
+from app.models.transaction import TransactionType
+from app.services.categories import get_user_categories
+from app.services.data_version import cached_per_version
+
+# Long enough for three yearly payments
+LOOKBACK_DAYS = 3 * 366
+# Amount bucket width: amounts within ~20% of each other share a bucket
+AMOUNT_BUCKET = 0.2
+# Share of intervals that must be within the period's tolerance of the median interval
+MIN_REGULARITY = 0.75
+# name, nominal interval (days), tolerance (days), minimum occurrences, calendar months per step
+PERIODS = (
+    ("weekly", 7.0, 1, 6, 0),
+    ("biweekly", 14.0, 2, 4, 0),
+    ("monthly", 30.44, 6, 4, 1),
+    ("quarterly", 91.31, 10, 3, 3),
+    ("yearly", 365.25, 15, 3, 12),
+)
+_NOMINAL = np.array([p[1] for p in PERIODS])
+_TOLERANCE = np.array([p[2] for p in PERIODS])
+_MIN_COUNT = np.array([p[3] for p in PERIODS])
+_WORD = re.compile(r"[^\W\d_]+")
+EPOCH = date(1970, 1, 1)
+
+
+@dataclass(frozen=True, slots=True)
+class RecurringSeries:
+    """One detected recurring payment or income, safe to share between requests."""
+    description: str
+    category_id: int
+    category_name: str
+    type: TransactionType
+    period: str
+    interval_days: int
+    amount: Decimal
+    amount_varies: bool
+    occurrences: int
+    first_date: date
+    last_date: date
+    next_date: date
+
+
+def normalize_description(description: str | None) -> str:
+    """Lower-cased words without digits or punctuation ("NETFLIX.COM 0423" -> "netflix com")."""
+    return " ".join(_WORD.findall((description or "").lower()))
+
+
+def _add_months(d: date, months: int) -> date:
+    month = d.month - 1 + months
+    year, month = d.year + month // 12, month % 12 + 1
+    return date(year, month, min(d.day, calendar.monthrange(year, month)[1]))
+
+
+def _factorize(values) -> tuple[np.ndarray, list]:
+    """Integer code per value (in order of first appearance) and the distinct values."""
+    codes: dict = {}
+    array = np.fromiter((codes.setdefault(v, len(codes)) for v in values), dtype=np.int64, count=len(values))
+    return array, list(codes)
+
+
+def _group_ids(*keys: np.ndarray) -> tuple[np.ndarray, int]:
+    """Dense group id per row for the combination of integer key columns."""
+    # Pack the columns into one int64 (mixed radix), which sorts far faster than rows
+    packed = np.zeros(len(keys[0]), dtype=np.int64)
+    for key in keys:
+        low = key.min()
+        packed = packed * (int(key.max()) - int(low) + 1) + (key - low)
+    uniq, inverse = np.unique(packed, return_inverse=True)
+    return inverse, len(uniq)
+
+
+def _group_median(values: np.ndarray, group: np.ndarray, n_groups: int) -> np.ndarray:
+    """Median of values per group (NaN for empty groups)."""
+    counts = np.bincount(group, minlength=n_groups)
+    ordered = values[np.lexsort((values, group))]
+    starts = np.cumsum(counts) - counts
+    median = np.full(n_groups, np.nan)
+    has = counts > 0
+    lo = ordered[starts[has] + (counts[has] - 1) // 2]
+    hi = ordered[starts[has] + counts[has] // 2]
+    median[has] = (lo + hi) / 2
+    return median
+
+
+def _detect(
+    days: np.ndarray, amounts: np.ndarray, group: np.ndarray, n_groups: int, today: int,
+) -> dict[str, np.ndarray]:
+    """Interval and amount statistics per group; "recurring" marks groups that look periodic and current."""
+    order = np.lexsort((days, group))
+    g, d, a = group[order], days[order], amounts[order]
+    counts = np.bincount(g, minlength=n_groups)
+    ends = np.cumsum(counts) - 1
+    starts = ends - counts + 1
+    same = g[1:] == g[:-1]
+    gaps = np.diff(d)[same].astype(np.float64)
+    gap_group = g[1:][same]
+    median = _group_median(gaps, gap_group, n_groups)
+
+    # Closest known period within tolerance of each group's median interval
+    distance = np.abs(median[:, None] - _NOMINAL[None, :])
+    fits = distance <= _TOLERANCE[None, :]
+    period = np.where(fits.any(axis=1), np.argmin(np.where(fits, distance, np.inf), axis=1), -1)
+    tolerance = np.where(period >= 0, _TOLERANCE[period], 0)
+    regular_gaps = np.abs(gaps - median[gap_group]) <= tolerance[gap_group]
+    n_gaps = np.maximum(counts - 1, 1)
+    regularity = np.bincount(gap_group, weights=regular_gaps, minlength=n_groups) / n_gaps
+
+    last = d[ends]
+    # Still running: the latest occurrence is at most one missed period ago
+    current = today - last <= np.nan_to_num(median) * 2 + tolerance
+    recurring = (
+        (period >= 0)
+        & (counts >= np.where(period >= 0, _MIN_COUNT[period], np.iinfo(np.int64).max))
+        & (regularity >= MIN_REGULARITY)
+        & current
+    )
+    return {
+        "recurring": recurring,
+        "period": period,
+        "median": median,
+        "amount": _group_median(amounts, group, n_groups),
+        "spread": np.maximum.reduceat(a, starts) - np.minimum.reduceat(a, starts),
+        "count": counts,
+        "first": d[starts],
+        "last": last,
+        "last_row": order[ends],
+    }
+
+
+def _epoch_days(db: Session):
+    """transaction_date as days since 1970-01-01, computed by the database (no date parsing)."""
+    if db.get_bind().dialect.name == "sqlite":
+        return cast(func.julianday(Transaction.transaction_date) - 2440587.5, Integer)
+    return cast(Transaction.transaction_date - literal_column("DATE '1970-01-01'"), Integer)
+
+
+def _load_history(db: Session, user_id: int, since: date):
+    statement_timeout(db, "report")
+    # Core execution on the session's connection: plain tuples, no ORM row processing
+    rows = db.connection().execute(
+        select(
+            _epoch_days(db),
+            cast(Transaction.amount, Float),
+            case((Transaction.type == TransactionType.income, 1), else_=0).cast(Integer),
+            Transaction.category_id,
+            Transaction.description,
+        ).where(
+            Transaction.user_id == user_id,
+            Transaction.deleted_at.is_(None),
+            Transaction.transaction_date >= since,
+            Transaction.amount > 0,
+        )
+    ).all()
+    if not rows:
+        return None
+    days, amounts, income, category_ids, descriptions = zip(*rows)
+    n = len(rows)
+    return (
+        np.fromiter(days, dtype=np.int64, count=n),
+        np.fromiter(amounts, dtype=np.float64, count=n),
+        np.fromiter(income, dtype=np.int64, count=n),
+        np.fromiter(category_ids, dtype=np.int64, count=n),
+        descriptions,
+    )
+
+
+@cached_per_version()
+def detect_recurring(db: Session, user_id: int, today: date) -> list[RecurringSeries]:
+    """Recurring series in the user's recent history that are still running, next due first.
+
+    today is part of the cache key: whether a series is current and when it is next
+    due depend on it. Results are cached under the user's data version.
+    """
+    history = _load_history(db, user_id, today - timedelta(days=LOOKBACK_DAYS))
+    if history is None:
+        return []
+    days, amounts, income, category_ids, descriptions = history
+    raw_codes, raw = _factorize(descriptions)
+    # Normalize each distinct description once, then map codes through a lookup array
+    normalized_codes, normalized = _factorize([normalize_description(r) for r in raw])
+    desc = normalized_codes[raw_codes]
+    # Rows without a usable description are only grouped with their own category
+    no_desc = np.array([not n for n in normalized], dtype=bool)[desc]
+    category_key = np.where(no_desc, category_ids, -1)
+    today_days = (today - EPOCH).days
+
+    group, n_groups = _group_ids(income, desc, category_key)
+    stats = _detect(days, amounts, group, n_groups, today_days)
+    passes = [stats]
+    # Second pass: rows of non-recurring groups, split further by amount bucket
+    rest = ~stats["recurring"][group]
+    if rest.any():
+        bucket = np.floor(np.log(amounts[rest]) / np.log1p(AMOUNT_BUCKET)).astype(np.int64)
+        sub_group, n_sub = _group_ids(income[rest], desc[rest], category_key[rest], bucket)
+        sub_stats = _detect(days[rest], amounts[rest], sub_group, n_sub, today_days)
+        sub_stats["last_row"] = np.flatnonzero(rest)[sub_stats["last_row"]]
+        passes.append(sub_stats)
+
+    names = get_user_categories(db, user_id).by_id
+    series = []
+    for stats in passes:
+        for gid in np.flatnonzero(stats["recurring"]):
+            name, _, _, _, months = PERIODS[stats["period"][gid]]
+            row = stats["last_row"][gid]
+            category_id = int(category_ids[row])
+            category_name = names[category_id].name if category_id in names else "Unknown"
+            typical = float(stats["amount"][gid])
+            interval = int(round(stats["median"][gid]))
+            last = EPOCH + timedelta(days=int(stats["last"][gid]))
+            series.append(RecurringSeries(
+                description=raw[raw_codes[row]] or category_name,
+                category_id=category_id,
+                category_name=category_name,
+                type=TransactionType.income if income[row] else TransactionType.expense,
+                period=name,
+                interval_days=interval,
+                amount=Decimal(str(round(typical, 2))).quantize(Decimal("0.01")),
+                amount_varies=bool(stats["spread"][gid] > typical * 0.05),
+                occurrences=int(stats["count"][gid]),
+                first_date=EPOCH + timedelta(days=int(stats["first"][gid])),
+                last_date=last,
+                next_date=_add_months(last, months) if months else last + timedelta(days=interval),
+            ))
+    series.sort(key=lambda s: (s.next_date, s.description))
+    return series
+
+
+# Async twin for request handlers
+detect_recurring_async = async_service(detect_recurring)
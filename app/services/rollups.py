@@ -0,0 +1,174 @@
+"""Rollup service: incremental monthly totals, rebuild and verify."""
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, update, delete, insert, cast, Date
+from sqlalchemy.exc import IntegrityError
+
+from app.models import Transaction, MonthlyRollup
+from app.database import statement_timeout
+from app.models.transaction import TransactionType
+from app.services.data_version import bump_all_data_versions, bump_data_version, result_cache
+
+
+def month_start_expr(db: Session, column):
+    """SQL expression for the first day of the month of a date column."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column, "start of month")
+    return cast(func.date_trunc("month", column), Date)
+
+
+def apply_delta(
+    db: Session,
+    user_id: int,
+    transaction_date: date,
+    category_id: int,
+    type_: TransactionType,
+    amount: Decimal,
+    count: int,
+) -> None:
+    """Add amount/count to the rollup row for the transaction's month. Does not commit."""
+    month = transaction_date.replace(day=1)
+    key = (
+        MonthlyRollup.user_id == user_id,
+        MonthlyRollup.month == month,
+        MonthlyRollup.category_id == category_id,
+        MonthlyRollup.type == type_,
+    )
+    stmt = (
+        update(MonthlyRollup)
+        .where(*key)
+        .values(total=MonthlyRollup.total + amount, count=MonthlyRollup.count + count)
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(stmt).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(MonthlyRollup).values(
+                user_id=user_id, month=month, category_id=category_id,
+                type=type_, total=amount, count=count,
+            ))
+    except IntegrityError:
+        # Another writer created the row first; fold into it
+        db.execute(stmt)
+
+
+def add_transaction(db: Session, trans: Transaction) -> None:
+    apply_delta(db, trans.user_id, trans.transaction_date, trans.category_id, trans.type, trans.amount, 1)
+
+
+def remove_transaction(db: Session, trans: Transaction) -> None:
+    apply_delta(db, trans.user_id, trans.transaction_date, trans.category_id, trans.type, -trans.amount, -1)
+
+
+def _aggregate_query(db: Session, user_id: int | None = None, since: date | None = None):
+    month = month_start_expr(db, Transaction.transaction_date)
+    q = (
+        select(
+            Transaction.user_id,
+            month.label("month"),
+            Transaction.category_id,
+            Transaction.type,
+            func.sum(Transaction.amount).label("total"),
+            func.count().label("count"),
+        )
+        .where(Transaction.deleted_at.is_(None))
+        .group_by(Transaction.user_id, month, Transaction.category_id, Transaction.type)
+    )
+    if user_id is not None:
+        q = q.where(Transaction.user_id == user_id)
+    if since is not None:
+        q = q.where(Transaction.transaction_date >= since.replace(day=1))
+    return q
+
+
+def rebuild_rollups(db: Session, user_id: int | None = None) -> int:
+    """Recompute rollups from raw transactions (all users or one). Returns rows written.
+
+    Bumps the data version of the user (every user without user_id) in the same
+    transaction, so every worker drops results cached from the old totals.
+    """
+    statement_timeout(db, "bulk")
+    d = delete(MonthlyRollup)
+    if user_id is not None:
+        d = d.where(MonthlyRollup.user_id == user_id)
+    db.execute(d)
+    agg = _aggregate_query(db, user_id)
+    result = db.execute(
+        insert(MonthlyRollup).from_select(
+            ["user_id", "month", "category_id", "type", "total", "count"], agg
+        )
+    )
+    if user_id is None:
+        bump_all_data_versions(db)
+    else:
+        bump_data_version(db, user_id)
+    db.commit()
+    # This process can drop the stale results right away
+    result_cache.clear()
+    return result.rowcount
+
+
+def verify_rollups(db: Session, user_id: int | None = None, since: date | None = None) -> list[dict]:
+    """Compare rollups to raw transactions (months from since's month on, if given).
+
+    Returns one dict per mismatched key.
+    """
+    statement_timeout(db, "report")
+    def _key(r) -> tuple:
+        month = r.month if isinstance(r.month, date) else date.fromisoformat(str(r.month)[:10])
+        type_ = r.type if isinstance(r.type, TransactionType) else TransactionType(r.type)
+        return (r.user_id, month, r.category_id, type_)
+
+    expected = {
+        _key(r): (Decimal(str(r.total)).quantize(Decimal("0.01")), r.count)
+        for r in db.execute(_aggregate_query(db, user_id, since)).all()
+    }
+    q = select(MonthlyRollup)
+    if user_id is not None:
+        q = q.where(MonthlyRollup.user_id == user_id)
+    if since is not None:
+        q = q.where(MonthlyRollup.month >= since.replace(day=1))
+    actual = {}
+    for r in db.execute(q).scalars().all():
+        total = Decimal(str(r.total)).quantize(Decimal("0.01"))
+        # Rows emptied by deletes/updates linger with zero totals; they are equivalent to no row
+        if r.count or total:
+            actual[(r.user_id, r.month, r.category_id, r.type)] = (total, r.count)
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        if expected.get(key) != actual.get(key):
+            user, month, cat, type_ = key
+            mismatches.append({
+                "user_id": user,
+                "month": month,
+                "category_id": cat,
+                "type": type_.value,
+                "expected": expected.get(key),
+                "actual": actual.get(key),
+            })
+    mismatches.sort(key=lambda m: (m["user_id"], m["month"], m["category_id"], m["type"]))
+    return mismatches
+
+
+def reconcile_rollups(db: Session, since: date | None = None) -> list[int]:
+    """Rebuild the rollups of every user whose rollups differ from raw transactions.
+
+    Periodic repair for the incrementally maintained totals (insights, budgets); pass
+    since to check only recent months. Each repaired user's data version is bumped
+    (see rebuild_rollups). Returns the repaired user ids.
+    """
+    users = sorted({m["user_id"] for m in verify_rollups(db, since=since)})
+    for user_id in users:
+        rebuild_rollups(db, user_id)
+    return users
+
+
+def backfill_rollups_if_empty(db: Session) -> None:
+    """Build rollups on first start after upgrade (table empty but transactions exist)."""
+    has_rollups = db.execute(select(MonthlyRollup.id).limit(1)).first()
+    has_transactions = db.execute(select(Transaction.id).limit(1)).first()
+    if not has_rollups and has_transactions:
+        rebuild_rollups(db)
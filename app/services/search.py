@@ -0,0 +1,144 @@
+"""Full-text description search: an FTS5 table on SQLite, a tsvector GIN index on Postgres.
+
+Queries are prefix matches on every term ("cof lat" finds "Coffee latte"), ranked
+by bm25 (SQLite) or ts_rank (Postgres). On Postgres the index is an expression index
+the database maintains itself. On SQLite transactions_fts is a separate table, kept
+in sync by the transaction write services (index_transaction / unindex_transaction)
+and the importer (index_rows); rebuild_search_index repopulates it after bulk loads.
+Each FTS row carries an owner token (u<user_id>) so a match only walks that user's
+postings instead of every user's.
+"""
+import re
+from collections.abc import Iterable
+
+from sqlalchemy import Connection, Integer, String, column, delete, func, insert, literal_column, select, table, text
+from sqlalchemy.orm import Session
+
+from app.models import Transaction
+
+FTS_TABLE = "transactions_fts"
+PG_INDEX = "ix_transactions_description_fts"
+# Longer queries add little and make every keystroke more expensive
+MAX_TERMS = 8
+_TERM = re.compile(r"[^\W_]+")
+
+_fts = table(
+    FTS_TABLE,
+    column("rowid", Integer),
+    column("description", String),
+    column("owner", String),
+    column("rank"),
+)
+_PG_CONFIG = literal_column("'simple'::regconfig")
+
+
+def search_terms(q: str | None) -> list[str]:
+    """Lower-cased word terms of a search string (punctuation and operators dropped)."""
+    return _TERM.findall((q or "").lower())[:MAX_TERMS]
+
+
+def _dialect(bind: Session | Connection) -> str:
+    if isinstance(bind, Session):
+        return bind.get_bind().dialect.name
+    return bind.dialect.name
+
+
+def needs_sync(db: Session) -> bool:
+    """True when the index is a separate table the application must write (SQLite)."""
+    return _dialect(db) == "sqlite"
+
+
+def _owner(user_id: int) -> str:
+    return f"u{user_id}"
+
+
+def create_search_index(conn: Connection) -> None:
+    """Create (and on SQLite populate) the full-text index. Migration step."""
+    dialect = _dialect(conn)
+    if dialect == "sqlite":
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "description, owner, prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+        )
+        # Rank by description only; the owner token is in every one of a user's rows
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(1.0, 0.0)')")
+        rebuild_search_index(conn)
+    elif dialect == "postgresql":
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON transactions "
+            "USING gin (to_tsvector('simple'::regconfig, coalesce(description, ''))) "
+            "WHERE deleted_at IS NULL"
+        ))
+
+
+def rebuild_search_index(bind: Session | Connection) -> None:
+    """Repopulate the SQLite FTS table from live transactions. Does not commit."""
+    if _dialect(bind) != "sqlite":
+        return
+    bind.execute(delete(_fts))
+    bind.execute(insert(_fts).from_select(
+        ["rowid", "description", "owner"],
+        select(
+            Transaction.id,
+            Transaction.description,
+            literal_column("'u'").op("||")(Transaction.user_id),
+        ).where(Transaction.deleted_at.is_(None), Transaction.description.is_not(None)),
+    ))
+
+
+def index_transaction(db: Session, trans: Transaction) -> None:
+    """(Re)index one transaction after it was created or edited. Does not commit."""
+    if not needs_sync(db):
+        return
+    db.execute(delete(_fts).where(_fts.c.rowid == trans.id))
+    if trans.description and trans.deleted_at is None:
+        db.execute(insert(_fts).values(rowid=trans.id, description=trans.description, owner=_owner(trans.user_id)))
+
+
+def unindex_transaction(db: Session, transaction_id: int) -> None:
+    if needs_sync(db):
+        db.execute(delete(_fts).where(_fts.c.rowid == transaction_id))
+
+
+def index_rows(db: Session, user_id: int, rows: Iterable[tuple[int, str | None]]) -> None:
+    """Index newly inserted (id, description) rows in one executemany. Does not commit."""
+    if not needs_sync(db):
+        return
+    params = [
+        {"rowid": tid, "description": description, "owner": _owner(user_id)}
+        for tid, description in rows
+        if description
+    ]
+    if params:
+        db.execute(insert(_fts), params)
+
+
+def apply_search(db: Session, stmt, user_id: int, q: str | None, ranked: bool = False):
+    """Restrict a select on Transaction to rows matching q; with ranked, best match first.
+
+    Returns stmt unchanged when q has no terms.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return stmt
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        prefixes = " ".join('"' + t + '"*' for t in terms)
+        match = f"owner:{_owner(user_id)} AND description:({prefixes})"
+        hits = (
+            select(_fts.c.rowid.label("id"), _fts.c.rank.label("rank"))
+            .where(literal_column(FTS_TABLE).op("MATCH")(match))
+            .subquery("search_hits")
+        )
+        # "+ 0" keeps the planner from probing the FTS table by rowid once per transaction
+        # row (re-running the MATCH each time); it runs the MATCH once and looks rows up by id
+        stmt = stmt.join(hits, hits.c.id + 0 == Transaction.id)
+        return stmt.order_by(hits.c.rank) if ranked else stmt
+    if dialect == "postgresql":
+        # Must match the index expression exactly for the planner to use it
+        vector = func.to_tsvector(_PG_CONFIG, func.coalesce(Transaction.description, literal_column("''")))
+        query = func.to_tsquery(_PG_CONFIG, " & ".join(t + ":*" for t in terms))
+        stmt = stmt.where(vector.op("@@")(query))
+        return stmt.order_by(func.ts_rank(vector, query).desc()) if ranked else stmt
+    # Other databases: unindexed substring match on every term
+    return stmt.where(*(Transaction.description.ilike(f"%{t}%") for t in terms))
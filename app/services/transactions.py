@@ -1,12 +1,24 @@
-"""Transaction service: CRUD, list with filters and pagination, soft delete."""
+"""Transaction service: CRUD, list with filters, search and pagination, soft delete."""
+import base64
+import csv
+import io
+import json
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
 from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, and_
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, func, and_, or_
 
-from app.models import Transaction, Category
+from app.config import EXPORT_BATCH_SIZE
+from app.models import Transaction
 from app.models.transaction import TransactionType
+from app.services import rollups, search
+from app.services.data_version import bump_data_version, cached_per_version
+from app.services.categories import CategoryInfo, get_category_for_user, get_user_categories
+from app.database import SessionLocal, async_service, statement_timeout
+from app.write_queue import queued_write
 
 
 def _parse_amount(v) -> Decimal | None:
@@ -27,6 +39,26 @@ def _parse_date(v) -> date | None:
         return None
 
 
+def _encode_cursor(direction: str, trans: Transaction) -> str:
+    """Opaque cursor for the (transaction_date, id) sort key. direction is 'a' (after) or 'b' (before)."""
+    raw = f"{direction}|{trans.transaction_date.isoformat()}|{trans.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str | None) -> tuple[str, date, int] | None:
+    """Return (direction, transaction_date, id) or None if the cursor is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        direction, d, tid = raw.split("|")
+        if direction not in ("a", "b"):
+            return None
+        return direction, date.fromisoformat(d), int(tid)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
 def create_transaction(
     db: Session,
     user_id: int,
@@ -35,9 +67,15 @@ def create_transaction(
     category_id: str | None,
     description: str | None,
     transaction_date: str | None,
+    commit: bool = True,
 ) -> tuple[Transaction | None, str | None]:
+    """Validate and add a transaction.
+
+    commit=False only flushes, leaving the commit to the caller (the group-commit
+    writer); the same goes for update_transaction and soft_delete_transaction.
+    """
     amount_val = _parse_amount(amount)
-    if amount_val is None or amount_val <= 0:
+    if amount_val is None or not amount_val.is_finite() or amount_val <= 0:
         return None, "Amount must be a positive number."
     try:
         type_enum = TransactionType(type_) if type_ else TransactionType.expense
@@ -53,8 +91,7 @@ def create_transaction(
     if not date_val:
         return None, "Transaction date is required."
     # Check category exists and is available to user
-    cat = db.get(Category, cat_id)
-    if not cat or (cat.user_id is not None and cat.user_id != user_id):
+    if not get_category_for_user(db, user_id, cat_id):
         return None, "Invalid category."
     trans = Transaction(
         user_id=user_id,
@@ -65,11 +102,22 @@ def create_transaction(
         transaction_date=date_val,
     )
     db.add(trans)
-    db.commit()
-    db.refresh(trans)
+    db.flush()
+    search.index_transaction(db, trans)
+    rollups.add_transaction(db, trans)
+    bump_data_version(db, user_id)
+    _finish(db, trans, commit)
     return trans, None
 
 
+def _finish(db: Session, trans: Transaction, commit: bool) -> None:
+    if commit:
+        db.commit()
+        db.refresh(trans)
+    else:
+        db.flush()
+
+
 def get_transaction(db: Session, user_id: int, transaction_id: int) -> Transaction | None:
     trans = db.get(Transaction, transaction_id)
     if not trans or trans.user_id != user_id or trans.deleted_at:
@@ -77,40 +125,109 @@ def get_transaction(db: Session, user_id: int, transaction_id: int) -> Transacti
     return trans
 
 
+def _filter_conditions(
+    user_id: int,
+    date_from: str | None,
+    date_to: str | None,
+    category_id: int | None,
+    type_filter: str | None,
+) -> list:
+    """WHERE clauses shared by the list and export queries."""
+    conds = [Transaction.user_id == user_id, Transaction.deleted_at.is_(None)]
+    if date_from:
+        d = _parse_date(date_from)
+        if d:
+            conds.append(Transaction.transaction_date >= d)
+    if date_to:
+        d = _parse_date(date_to)
+        if d:
+            conds.append(Transaction.transaction_date <= d)
+    if category_id is not None:
+        conds.append(Transaction.category_id == category_id)
+    if type_filter and type_filter in ("income", "expense"):
+        conds.append(Transaction.type == type_filter)
+    return conds
+
+
 def list_transactions(
     db: Session,
     user_id: int,
-    page: int = 1,
+    page: int | None = None,
     per_page: int = 20,
     date_from: str | None = None,
     date_to: str | None = None,
     category_id: int | None = None,
     type_filter: str | None = None,
+    cursor: str | None = None,
+    q: str | None = None,
 ) -> dict:
-    q = select(Transaction).where(
-        Transaction.user_id == user_id,
-        Transaction.deleted_at.is_(None),
+    """List transactions newest first.
+
+    By default pages with a keyset cursor on (transaction_date, id), so every page costs
+    the same and no COUNT is run. Passing page switches to LIMIT/OFFSET with a total count.
+    A search query q (prefix match on the description) ranks best matches first and
+    always pages by number, since the rank is not a stable cursor key.
+    """
+    stmt = select(Transaction).where(
+        *_filter_conditions(user_id, date_from, date_to, category_id, type_filter)
     )
-    if date_from:
-        d = _parse_date(date_from)
-        if d:
-            q = q.where(Transaction.transaction_date >= d)
-    if date_to:
-        d = _parse_date(date_to)
-        if d:
-            q = q.where(Transaction.transaction_date <= d)
-    if category_id is not None:
-        q = q.where(Transaction.category_id == category_id)
-    if type_filter and type_filter in ("income", "expense"):
-        q = q.where(Transaction.type == type_filter)
-    count_q = select(func.count()).select_from(q.subquery())
+    if search.search_terms(q):
+        return _list_page(db, search.apply_search(db, stmt, user_id, q, ranked=True), page or 1, per_page)
+    if page is not None:
+        return _list_page(db, stmt, page, per_page)
+    return _list_keyset(db, stmt, per_page, _decode_cursor(cursor))
+
+
+def _list_page(db: Session, q, page: int, per_page: int) -> dict:
+    count_q = select(func.count()).select_from(q.order_by(None).subquery())
     total = db.execute(count_q).scalar() or 0
+    # Appended after any search rank ordering, as the tie-break
     q = q.order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
-    q = q.offset((page - 1) * per_page).limit(per_page)
+    q = q.offset((page - 1) * per_page).limit(per_page).options(joinedload(Transaction.category))
     items = list(db.execute(q).scalars().all())
     import math
     total_pages = max(1, math.ceil(total / per_page)) if total else 1
-    return {"items": items, "total": total, "total_pages": total_pages}
+    return {
+        "items": items, "page": page, "total": total, "total_pages": total_pages,
+        "next_cursor": None, "prev_cursor": None,
+    }
+
+
+def _list_keyset(db: Session, q, per_page: int, key: tuple[str, date, int] | None) -> dict:
+    backwards = key is not None and key[0] == "b"
+    if key is not None:
+        _, d, tid = key
+        if backwards:
+            q = q.where(or_(
+                Transaction.transaction_date > d,
+                and_(Transaction.transaction_date == d, Transaction.id > tid),
+            ))
+        else:
+            q = q.where(or_(
+                Transaction.transaction_date < d,
+                and_(Transaction.transaction_date == d, Transaction.id < tid),
+            ))
+    if backwards:
+        q = q.order_by(Transaction.transaction_date.asc(), Transaction.id.asc())
+    else:
+        q = q.order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+    # Fetch one extra row to know whether another page exists in the scan direction
+    rows = list(db.execute(q.limit(per_page + 1).options(joinedload(Transaction.category))).scalars().all())
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+    if backwards:
+        items.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, key is not None
+    return {
+        "items": items,
+        "page": None,
+        "total": None,
+        "total_pages": None,
+        "next_cursor": _encode_cursor("a", items[-1]) if items and has_next else None,
+        "prev_cursor": _encode_cursor("b", items[0]) if items and has_prev else None,
+    }
 
 
 def update_transaction(
@@ -122,12 +239,13 @@ def update_transaction(
     category_id: str | None,
     description: str | None,
     transaction_date: str | None,
+    commit: bool = True,
 ) -> tuple[Transaction | None, str | None]:
     trans = get_transaction(db, user_id, transaction_id)
     if not trans:
         return None, "Transaction not found."
     amount_val = _parse_amount(amount)
-    if amount_val is None or amount_val <= 0:
+    if amount_val is None or not amount_val.is_finite() or amount_val <= 0:
         return None, "Amount must be a positive number."
     try:
         type_enum = TransactionType(type_) if type_ else trans.type
@@ -142,33 +260,135 @@ def update_transaction(
     date_val = _parse_date(transaction_date)
     if not date_val:
         return None, "Transaction date is required."
-    cat = db.get(Category, cat_id)
-    if not cat or (cat.user_id is not None and cat.user_id != user_id):
+    if not get_category_for_user(db, user_id, cat_id):
         return None, "Invalid category."
+    rollups.remove_transaction(db, trans)
     trans.amount = amount_val
     trans.type = type_enum
     trans.category_id = cat_id
     trans.description = (description or "").strip() or None
     trans.transaction_date = date_val
-    db.commit()
-    db.refresh(trans)
+    search.index_transaction(db, trans)
+    rollups.add_transaction(db, trans)
+    bump_data_version(db, user_id)
+    _finish(db, trans, commit)
     return trans, None
 
 
-def soft_delete_transaction(db: Session, user_id: int, transaction_id: int) -> bool:
+def soft_delete_transaction(db: Session, user_id: int, transaction_id: int, commit: bool = True) -> bool:
     trans = get_transaction(db, user_id, transaction_id)
     if not trans:
         return False
     trans.deleted_at = datetime.utcnow()
-    db.commit()
+    search.unindex_transaction(db, trans.id)
+    rollups.remove_transaction(db, trans)
+    bump_data_version(db, user_id)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     return True
 
 
-def get_recent_transactions(db: Session, user_id: int, limit: int = 10) -> list[Transaction]:
+@dataclass(frozen=True, slots=True)
+class TransactionRow:
+    """Session-independent copy of a transaction for cached, read-only views."""
+    id: int
+    transaction_date: date
+    type: TransactionType
+    amount: Decimal
+    description: str | None
+    category_id: int
+    category: CategoryInfo
+
+
+def _snapshot_rows(items: list[Transaction]) -> list[TransactionRow]:
+    return [
+        TransactionRow(
+            id=t.id,
+            transaction_date=t.transaction_date,
+            type=t.type,
+            amount=t.amount,
+            description=t.description,
+            category_id=t.category_id,
+            category=CategoryInfo(t.category.id, t.category.name, t.category.user_id, bool(t.category.is_predefined)),
+        )
+        for t in items
+    ]
+
+
+@cached_per_version(snapshot=_snapshot_rows)
+def get_recent_transactions(db: Session, user_id: int, limit: int = 10) -> list[TransactionRow]:
     q = (
         select(Transaction)
         .where(Transaction.user_id == user_id, Transaction.deleted_at.is_(None))
         .order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
         .limit(limit)
+        .options(joinedload(Transaction.category))
     )
     return list(db.execute(q).scalars().all())
+
+
+EXPORT_COLUMNS = ["id", "date", "type", "category", "amount", "description"]
+
+
+def export_transactions(
+    user_id: int,
+    fmt: str = "csv",
+    date_from: str | None = None,
+    date_to: str | None = None,
+    category_id: int | None = None,
+    type_filter: str | None = None,
+    q: str | None = None,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> Iterator[str]:
+    """Yield the user's filtered transactions as CSV or NDJSON text chunks, newest first.
+
+    Opens its own session (from session_factory, e.g. the read engine's) so it can run
+    after the handler returns (StreamingResponse iterates it in the threadpool). Rows are
+    plain column tuples fetched yield_per at a time, which streams from a server-side
+    cursor on Postgres, so memory stays flat.
+    """
+    if fmt == "csv":
+        yield ",".join(EXPORT_COLUMNS) + "\r\n"
+    stmt = (
+        select(
+            Transaction.id,
+            Transaction.transaction_date,
+            Transaction.type,
+            Transaction.category_id,
+            Transaction.amount,
+            Transaction.description,
+        )
+        .where(*_filter_conditions(user_id, date_from, date_to, category_id, type_filter))
+        .order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    with session_factory() as db:
+        statement_timeout(db, "report")
+        stmt = search.apply_search(db, stmt, user_id, q)
+        names = get_user_categories(db, user_id).by_id
+        for rows in db.execute(stmt).partitions():
+            buf = io.StringIO()
+            writer = csv.writer(buf) if fmt == "csv" else None
+            for tid, d, type_, cat_id, amount, description in rows:
+                values = [
+                    tid, d.isoformat(), type_.value,
+                    names[cat_id].name if cat_id in names else "Unknown",
+                    str(amount), description or "",
+                ]
+                if writer is not None:
+                    writer.writerow(values)
+                else:
+                    buf.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))) + "\n")
+            yield buf.getvalue()
+
+
+# Async twins for request handlers
+# (writes go through the group-commit queue when GROUP_COMMIT is on)
+create_transaction_async = queued_write(create_transaction)
+get_transaction_async = async_service(get_transaction)
+list_transactions_async = async_service(list_transactions)
+update_transaction_async = queued_write(update_transaction)
+soft_delete_transaction_async = queued_write(soft_delete_transaction)
+get_recent_transactions_async = async_service(get_recent_transactions)
@@ -0,0 +1,164 @@
+"""Trend series for charts: income, expense and net per day, week or month.
+
+The database buckets and sums in one GROUP BY (strftime on SQLite, date_trunc on
+Postgres); month series read whole months from monthly_rollups. The sparse buckets it
+returns are spread onto a dense NumPy axis, where net, running balance and trailing
+moving averages are computed in vectorized form.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import DateTime, Float, case, cast, func, select, union_all
+from sqlalchemy.orm import Session
+
+from app.database import async_service, statement_timeout
+from app.models import MonthlyRollup, Transaction
+from app.models.transaction import TransactionType
+from app.services.data_version import cached_per_version
+from app.services.insights import _split_range
+
+GRANULARITIES = ("day", "week", "month")
+# Longest series served: ten years of days
+MAX_BUCKETS = 3660
+
+
+def bucket_start(d: date, granularity: str) -> date:
+    """First day of the bucket containing d (weeks start on Monday)."""
+    if granularity == "week":
+        return d - timedelta(days=d.weekday())
+    if granularity == "month":
+        return d.replace(day=1)
+    return d
+
+
+def clamp_range(date_from: date, date_to: date, granularity: str) -> date:
+    """date_from moved forward, if needed, so the series has at most MAX_BUCKETS buckets."""
+    if granularity == "month":
+        first = date_to.year * 12 + date_to.month - MAX_BUCKETS
+        earliest = date(first // 12, first % 12 + 1, 1)
+    else:
+        days = MAX_BUCKETS * (7 if granularity == "week" else 1)
+        earliest = bucket_start(date_to, granularity) - timedelta(days=days - 1)
+    return max(date_from, earliest)
+
+
+def _bucket(db: Session, column, granularity: str):
+    """SQL expression for the bucket start of a date column, as 'YYYY-MM-DD' text."""
+    if db.get_bind().dialect.name == "sqlite":
+        if granularity == "month":
+            return func.strftime("%Y-%m-01", column)
+        if granularity == "week":
+            # Forward to the week's Sunday (same day if already Sunday), back to its Monday
+            return func.date(column, "weekday 0", "-6 days")
+        return func.date(column)
+    # timestamp, not timestamptz: truncation must not depend on the session time zone
+    return func.to_char(func.date_trunc(granularity, cast(column, DateTime)), "YYYY-MM-DD")
+
+
+def _axis(date_from: date, date_to: date, granularity: str) -> np.ndarray:
+    """Dense datetime64[D] bucket starts covering the range."""
+    first, last = bucket_start(date_from, granularity), bucket_start(date_to, granularity)
+    if granularity == "month":
+        return np.arange(np.datetime64(first, "M"), np.datetime64(last, "M") + 1).astype("datetime64[D]")
+    step = 7 if granularity == "week" else 1
+    return np.arange(np.datetime64(first), np.datetime64(last) + 1, step)
+
+
+def _trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of each value and up to window - 1 before it (shorter windows at the start)."""
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    return (sums[end] - sums[start]) / (end - start)
+
+
+def _rows(db: Session, user_id: int, date_from: date, date_to: date, granularity: str) -> list:
+    """(bucket, income, expense) per non-empty bucket, in one grouped query."""
+    live = (
+        Transaction.user_id == user_id,
+        Transaction.deleted_at.is_(None),
+    )
+    if granularity == "month":
+        first, last, edges = _split_range(date_from, date_to)
+    else:
+        first, last, edges = None, None, [(date_from, date_to)]
+    parts = []
+    if first is not None:
+        parts.append(
+            select(
+                _bucket(db, MonthlyRollup.month, "month").label("bucket"),
+                MonthlyRollup.type.label("type"),
+                MonthlyRollup.total.label("amount"),
+            ).where(
+                MonthlyRollup.user_id == user_id,
+                MonthlyRollup.month >= first,
+                MonthlyRollup.month <= last,
+            )
+        )
+    for a, b in edges:
+        parts.append(
+            select(
+                _bucket(db, Transaction.transaction_date, granularity).label("bucket"),
+                Transaction.type.label("type"),
+                Transaction.amount.label("amount"),
+            ).where(*live, Transaction.transaction_date.between(a, b))
+        )
+    if not parts:
+        return []
+    src = (parts[0] if len(parts) == 1 else union_all(*parts)).subquery()
+    q = (
+        select(
+            src.c.bucket,
+            cast(func.sum(case((src.c.type == TransactionType.income, src.c.amount), else_=0)), Float),
+            cast(func.sum(case((src.c.type == TransactionType.expense, src.c.amount), else_=0)), Float),
+        )
+        .group_by(src.c.bucket)
+    )
+    statement_timeout(db, "report")
+    # Core execution: plain tuples, no ORM row processing
+    return db.connection().execute(q).all()
+
+
+@cached_per_version()
+def get_trends(
+    db: Session, user_id: int, granularity: str, date_from: date, date_to: date, window: int = 3,
+) -> dict:
+    """Columnar series for the range, one entry per bucket (empty buckets are zero).
+
+    Returns {"granularity", "window", "date_from", "date_to", "buckets": [...], "income",
+    "expense", "net", "balance" (running net since date_from), and trailing window-bucket
+    means "income_avg", "expense_avg", "net_avg"}. Callers must not mutate it (cached).
+    """
+    date_from = clamp_range(date_from, date_to, granularity)
+    axis = _axis(date_from, date_to, granularity)
+    income = np.zeros(len(axis))
+    expense = np.zeros(len(axis))
+    rows = _rows(db, user_id, date_from, date_to, granularity)
+    if rows:
+        buckets, sums_in, sums_out = zip(*rows)
+        index = np.searchsorted(axis, np.array(buckets, dtype="datetime64[D]"))
+        income[index] = np.array(sums_in, dtype=np.float64)
+        expense[index] = np.array(sums_out, dtype=np.float64)
+    net = income - expense
+
+    def money(values: np.ndarray) -> list[float]:
+        return np.round(values, 2).tolist()
+
+    return {
+        "granularity": granularity,
+        "window": window,
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "buckets": axis.astype(str).tolist(),
+        "income": money(income),
+        "expense": money(expense),
+        "net": money(net),
+        "balance": money(np.cumsum(net)),
+        "income_avg": money(_trailing_mean(income, window)),
+        "expense_avg": money(_trailing_mean(expense, window)),
+        "net_avg": money(_trailing_mean(net, window)),
+    }
+
+
+# Async twin for request handlers
+get_trends_async = async_service(get_trends)
@@ -0,0 +1,100 @@
+"""Database initialisation shared by app startup and scripts, safe with many workers.
+
+Every worker (and every script) may call initialize_database; a cross-process lock
+makes them take turns, so only the first does real work and the rest find the schema,
+migrations and seed data already in place (a handful of cheap checks).
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import time
+import zlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import Engine, text
+
+try:
+    import fcntl
+except ImportError:  # Windows: no file lock; run a single worker there
+    fcntl = None
+
+logger = logging.getLogger("app.startup")
+
+# pg_advisory_lock key: any bigint, fixed per application
+INIT_LOCK_KEY = zlib.crc32(b"financetracker:init")
+
+
+def _lock_file_path(engine: Engine) -> str:
+    """One lock file per database, in the temp directory (the database's own directory may be read-only)."""
+    digest = hashlib.sha1(str(engine.url).encode()).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"financetracker-init-{digest}.lock")
+
+
+@contextmanager
+def init_lock(engine: Engine) -> Iterator[None]:
+    """Hold a lock shared by every process using this database.
+
+    Postgres: a session-level advisory lock. SQLite: flock on a lock file, which covers
+    all workers on this host (the only ones that can share a SQLite file).
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            # Waiting out another process's init can take far longer than the pool's
+            # default statement_timeout. Session level (not set_config(..., true)), since
+            # the lock outlives this transaction; RESET restores the connect-time value
+            # before the connection goes back to the pool.
+            conn.exec_driver_sql("SET statement_timeout = 0")
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": INIT_LOCK_KEY})
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": INIT_LOCK_KEY})
+                conn.exec_driver_sql("RESET statement_timeout")
+                conn.commit()
+        return
+    if engine.dialect.name != "sqlite" or fcntl is None:
+        yield
+        return
+    with open(_lock_file_path(engine), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def initialize_database(engine: Engine) -> dict:
+    """Create tables, apply migrations, seed categories and backfill rollups, under init_lock.
+
+    Returns what was done: {"migrations": [...], "seeded": n, "waited_s": s, "took_s": s}.
+    """
+    from app.database import Base, statement_timeout
+    from app.migrations import run_migrations
+    from app.services.categories import seed_predefined_categories
+    from app.services.rollups import backfill_rollups_if_empty
+    from sqlalchemy.orm import Session
+
+    started = time.perf_counter()
+    with init_lock(engine):
+        locked = time.perf_counter()
+        # Init is bulk work: table and index builds on a large database outlast the web timeout
+        with engine.begin() as conn:
+            statement_timeout(conn, "bulk")
+            Base.metadata.create_all(bind=conn)
+        applied = run_migrations(engine)
+        with Session(engine) as db:
+            statement_timeout(db, "bulk")
+            seeded = seed_predefined_categories(db)
+            backfill_rollups_if_empty(db)
+    done = time.perf_counter()
+    result = {
+        "migrations": applied,
+        "seeded": seeded,
+        "waited_s": round(locked - started, 3),
+        "took_s": round(done - locked, 3),
+    }
+    logger.info("Database init: %s", result)
+    return result
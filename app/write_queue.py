@@ -0,0 +1,153 @@
+"""Group commit: one writer applies queued writes from many requests in one transaction.
+
+SQLite allows a single writer at a time, so concurrent requests that each commit
+queue up on the database lock (and eventually fail with "database is locked").
+With GROUP_COMMIT on, write services are instead submitted here: a writer task
+collects whatever is queued (waiting up to GROUP_COMMIT_WINDOW_MS for more), runs
+each job in its own SAVEPOINT on one session in a dedicated thread, and commits the
+whole group once. Each caller awaits its own job's result or exception.
+"""
+import asyncio
+import contextvars
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.orm import sessionmaker
+
+from app.config import GROUP_COMMIT, GROUP_COMMIT_MAX_BATCH, GROUP_COMMIT_WINDOW_MS
+from app.database import engine, run_db
+
+
+@dataclass
+class _Job:
+    fn: Callable
+    args: tuple
+    kwargs: dict
+    future: asyncio.Future
+    result: Any = None
+    error: BaseException | None = None
+
+
+class WriteQueue:
+    """Coalesces write jobs fn(db, *args, commit=False, **kwargs) into group commits."""
+
+    def __init__(self, window_ms: float = GROUP_COMMIT_WINDOW_MS, max_batch: int = GROUP_COMMIT_MAX_BATCH):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        # Updated only by the writer thread
+        self.jobs = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.largest_batch = 0
+        # Objects returned to callers must stay readable after the writer's session closes
+        self._session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="group-commit")
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, fn: Callable, *args, **kwargs):
+        """Queue fn(db, *args, commit=False, **kwargs) and wait for its group to commit."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put(_Job(fn, args, {**kwargs, "commit": False}, future))
+        return await future
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        # A new event loop (tests, restarts) gets a new queue and writer task
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            # Fresh context: the writer must not inherit the first caller's request state
+            self._task = loop.create_task(self._run(), context=contextvars.Context())
+
+    async def _collect(self) -> list[_Job]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                await self._loop.run_in_executor(self._executor, self._apply, batch)
+            except Exception as exc:
+                # _apply itself failed (no session, rollback on a dead connection): fail
+                # this group's callers and keep serving the queue
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(exc)
+                continue
+            for job in batch:
+                if job.future.done():
+                    continue
+                if job.error is not None:
+                    job.future.set_exception(job.error)
+                else:
+                    job.future.set_result(job.result)
+
+    def _apply(self, batch: list[_Job]) -> None:
+        """Run every job in its own savepoint, then commit the group once (writer thread)."""
+        with self._session_factory() as db:
+            if db.get_bind().dialect.name == "sqlite":
+                # pysqlite defers BEGIN to the first INSERT/UPDATE, so the first SAVEPOINT would
+                # become the outermost transaction and each RELEASE would commit its job alone.
+                # Open the group's transaction explicitly (IMMEDIATE: take the write lock now).
+                db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            for job in batch:
+                try:
+                    with db.begin_nested():
+                        job.result = job.fn(db, *job.args, **job.kwargs)
+                except Exception as exc:
+                    job.error = exc
+            try:
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                for job in batch:
+                    if job.error is None:
+                        job.error = exc
+                failed = True
+            else:
+                failed = False
+        self.jobs += len(batch)
+        self.batches += 1
+        self.failed_batches += failed
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+
+write_queue = WriteQueue()
+
+
+def queued_write(fn: Callable) -> Callable:
+    """Async twin of a write service fn(db, ..., commit=True).
+
+    With GROUP_COMMIT on the write goes through the group-commit queue (the request's
+    session is not used); otherwise it runs on the request's session like async_service.
+    """
+    @functools.wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        if GROUP_COMMIT:
+            return await write_queue.submit(fn, *args, **kwargs)
+        return await run_db(db, fn, *args, **kwargs)
+    return wrapper
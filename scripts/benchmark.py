@@ -0,0 +1,302 @@
+"""
+Benchmark service functions and routes against a synthetic SQLite database. Run from project root:
+  python scripts/benchmark.py                              # 10k rows, 5 users
+  python scripts/benchmark.py --rows 1000000 --users 50 --repeat 10 --out after.json
+  python scripts/benchmark.py --compare before.json after.json
+The database is generated once per (rows, users, seed, months, end) with
+scripts/generate_data.py and reused from the temp directory (or --db). Routes run
+through the in-process ASGI app (httpx.ASGITransport), logged in as the heaviest user.
+
+Each case runs once to warm up, then --repeat times. "cold" cases clear the
+in-process result, data-version and category caches before every run; "warm" cases
+do not. Results (min/median/mean/p95/max ms and queries per run) go to --out as JSON,
+default bench-results/<git commit>.json, so runs can be compared between commits.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Allow running from project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _summarize(samples: list[float], queries: int | None) -> dict:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "runs": len(samples),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "queries": queries,
+    }
+
+
+def clear_caches() -> None:
+    from app.services.categories import category_cache
+    from app.services.data_version import result_cache, version_cache
+    result_cache.clear()
+    version_cache.clear()
+    category_cache.clear()
+
+
+def ensure_data(args) -> dict:
+    """Generate the benchmark database unless it already holds this dataset."""
+    from sqlalchemy import func, select
+    from app.database import SessionLocal
+    from app.models import Transaction, User
+    from generate_data import generate, prepare_schema
+
+    prepare_schema()
+    with SessionLocal() as db:
+        heavy = db.execute(select(User).where(User.email == "bench1@example.com")).scalar_one_or_none()
+        if heavy is None:
+            print(f"Generating {args.rows:,} rows for {args.users} users ...")
+            started = time.perf_counter()
+            generate(db, users=args.users, rows=args.rows, seed=args.seed, months=args.months, end=args.end)
+            print(f"  done in {time.perf_counter() - started:.1f}s")
+            heavy = db.execute(select(User).where(User.email == "bench1@example.com")).scalar_one()
+        rows = db.execute(select(func.count()).select_from(Transaction).where(Transaction.user_id == heavy.id)).scalar()
+        return {"user_id": heavy.id, "user_rows": rows}
+
+
+def service_cases(user_id: int, end: date) -> list[tuple[str, bool, callable]]:
+    """(name, cold, fn(db)) for each service benchmark."""
+    from sqlalchemy import select
+    from app.models import Category, Transaction
+    from app.services import budgets, insights, recurring, transactions, trends
+    from app.services.categories import get_user_categories
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        live = transactions._filter_conditions(user_id, None, None, None, None)
+        total = db.execute(select(Transaction.id).where(*live).order_by(Transaction.id)).scalars().all()
+        middle = db.execute(
+            select(Transaction).where(*live)
+            .order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+            .offset(len(total) // 2).limit(1)
+        ).scalar_one()
+        mid_cursor = transactions._encode_cursor("a", middle)
+        food_id = db.execute(
+            select(Category.id).where(Category.user_id.is_(None), Category.name == "Food")
+        ).scalar_one()
+    deep_page = max(1, len(total) // 2 // 20)
+    month_start = end.replace(day=1)
+
+    def export_all(db):
+        for _ in transactions.export_transactions(user_id, "csv"):
+            pass
+
+    cases = [
+        ("list_transactions keyset first page", lambda db: transactions.list_transactions(db, user_id)),
+        ("list_transactions keyset middle", lambda db: transactions.list_transactions(db, user_id, cursor=mid_cursor)),
+        ("list_transactions offset page 1", lambda db: transactions.list_transactions(db, user_id, page=1)),
+        (f"list_transactions offset page {deep_page}", lambda db: transactions.list_transactions(db, user_id, page=deep_page)),
+        ("list_transactions category filter", lambda db: transactions.list_transactions(db, user_id, category_id=food_id)),
+        ("list_transactions date+type filter", lambda db: transactions.list_transactions(
+            db, user_id, date_from=(end - timedelta(days=90)).isoformat(), date_to=end.isoformat(), type_filter="expense",
+        )),
+        ("list_transactions search 'co'", lambda db: transactions.list_transactions(db, user_id, q="co")),
+        ("list_transactions search 'super'", lambda db: transactions.list_transactions(db, user_id, q="super")),
+        ("get_recent_transactions", lambda db: transactions.get_recent_transactions(db, user_id)),
+        ("get_period_insights 30 days", lambda db: insights.get_period_insights(db, user_id, end - timedelta(days=30), end)),
+        ("get_period_insights 6 months", lambda db: insights.get_period_insights(db, user_id, end - timedelta(days=180), end)),
+        ("get_period_insights 12 months", lambda db: insights.get_period_insights(db, user_id, end - timedelta(days=365), end)),
+        ("get_monthly_summary", lambda db: insights.get_monthly_summary(db, user_id, month_start.year, month_start.month)),
+        ("get_budget_status", lambda db: budgets.get_budget_status(db, user_id, month_start)),
+        ("detect_recurring", lambda db: recurring.detect_recurring(db, user_id, end)),
+        ("get_trends month 5 years", lambda db: trends.get_trends(db, user_id, "month", end - timedelta(days=5 * 365), end)),
+        ("get_trends day 12 months", lambda db: trends.get_trends(db, user_id, "day", end - timedelta(days=365), end)),
+        ("get_user_categories", lambda db: get_user_categories(db, user_id)),
+        ("export_transactions csv", export_all),
+    ]
+    out = []
+    for name, fn in cases:
+        out.append((name, True, fn))
+        if name.startswith(("get_recent", "get_period", "get_monthly", "get_budget_status", "detect_recurring", "get_trends", "get_user_categories")):
+            out.append((name, False, fn))
+    return out
+
+
+def run_services(user_id: int, end: date, repeat: int) -> dict:
+    from app.database import SessionLocal, track_queries
+    results = {}
+    for name, cold, fn in service_cases(user_id, end):
+        samples = []
+        queries = None
+        for i in range(repeat + 1):
+            if cold:
+                clear_caches()
+            with SessionLocal() as db, track_queries() as stats:
+                started = time.perf_counter()
+                fn(db)
+                elapsed = time.perf_counter() - started
+            if i:
+                samples.append(elapsed)
+                queries = stats.count
+        key = f"service {name} [{'cold' if cold else 'warm'}]"
+        results[key] = _summarize(samples, queries)
+        print(f"  {key:<60} {results[key]['median_ms']:>10.2f} ms  {queries} queries")
+    return results
+
+
+async def _run_routes(user_id: int, repeat: int) -> dict:
+    import httpx
+    from app.config import COOKIE_NAME
+    from app.main import app
+    from app.services.auth import create_access_token
+    from app.services.categories import get_user_categories
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        food_id = next(c.id for c in get_user_categories(db, user_id).items if c.name == "Food")
+    token = create_access_token(user_id)
+    token = token.decode() if isinstance(token, bytes) else token
+    hx = {"HX-Request": "true"}
+    cases = [
+        ("/dashboard", {}),
+        ("/transactions", {}),
+        ("/transactions?page=1", {}),
+        (f"/transactions?category_id={food_id}", {}),
+        ("/transactions?type=expense", hx),
+        ("/transactions?q=gro", hx),
+        ("/insights?period=30", {}),
+        ("/insights?period=6months", {}),
+        ("/insights?period=6months", hx),
+        ("/insights/trends?granularity=month&date_from=2000-01-01", {}),
+        ("/insights/trends?granularity=day", {}),
+        ("/categories", {}),
+        ("/transactions/export?format=csv", {}),
+    ]
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies={COOKIE_NAME: token}) as client:
+        for path, headers in cases:
+            for mode in ("cold", "warm", "304"):
+                if mode == "304" and "export" in path:
+                    continue
+                samples = []
+                queries = None
+                etag = None
+                for i in range(repeat + 1):
+                    if mode == "cold":
+                        clear_caches()
+                    h = dict(headers)
+                    if mode == "304" and etag:
+                        h["If-None-Match"] = etag
+                    started = time.perf_counter()
+                    r = await client.get(path, headers=h)
+                    await r.aread()
+                    elapsed = time.perf_counter() - started
+                    if r.status_code not in (200, 304):
+                        raise RuntimeError(f"{path}: HTTP {r.status_code}")
+                    etag = r.headers.get("etag")
+                    if i:
+                        samples.append(elapsed)
+                        queries = int(r.headers.get("x-db-queries", -1))
+                key = f"route GET {path}{' (htmx)' if headers else ''} [{mode}]"
+                results[key] = _summarize(samples, queries)
+                print(f"  {key:<60} {results[key]['median_ms']:>10.2f} ms  {queries} queries")
+    return results
+
+
+def compare(old_path: str, new_path: str) -> int:
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{'case':<62} {'before':>10} {'after':>10} {'change':>8}")
+    for name, after in new["results"].items():
+        before = old["results"].get(name)
+        if before is None:
+            print(f"{name:<62} {'-':>10} {after['median_ms']:>10.2f} {'new':>8}")
+            continue
+        change = (after["median_ms"] - before["median_ms"]) / before["median_ms"] * 100 if before["median_ms"] else 0.0
+        print(f"{name:<62} {before['median_ms']:>10.2f} {after['median_ms']:>10.2f} {change:>+7.1f}%")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="Last generated date (default today)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", default=None, help="SQLite file (default: temp dir, named after the dataset)")
+    parser.add_argument("--out", default=None, help="JSON results (default bench-results/<commit>.json)")
+    parser.add_argument("--only", choices=["services", "routes"], default=None)
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two result files and exit")
+    args = parser.parse_args()
+    if args.compare:
+        return compare(*args.compare)
+
+    db_path = args.db or os.path.join(
+        tempfile.gettempdir(),
+        f"financetracker-bench-{args.rows}-{args.users}-{args.seed}-{args.months}-{args.end.isoformat()}.db",
+    )
+    # Before any app import: app.config reads these once
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.environ["SQL_STATS_HEADERS"] = "1"
+    os.environ.setdefault("TEMPLATE_PRECOMPILE", "1")
+
+    dataset = ensure_data(args)
+    print(f"Database {db_path}: heaviest user has {dataset['user_rows']:,} transactions")
+    results = {}
+    if args.only != "routes":
+        print("Services")
+        results.update(run_services(dataset["user_id"], args.end, args.repeat))
+    if args.only != "services":
+        print("Routes")
+        results.update(asyncio.run(_run_routes(dataset["user_id"], args.repeat)))
+
+    import sqlalchemy
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "sqlite": __import__("sqlite3").sqlite_version,
+            "rows": args.rows,
+            "users": args.users,
+            "seed": args.seed,
+            "months": args.months,
+            "end": args.end.isoformat(),
+            "repeat": args.repeat,
+            "user_rows": dataset["user_rows"],
+        },
+        "results": results,
+    }
+    out = args.out or os.path.join(ROOT, "bench-results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Generate reproducible synthetic users and transactions. Run from project root:
+  python scripts/generate_data.py --users 10 --rows 100000
+  python scripts/generate_data.py --users 200 --rows 5000000 --seed 7 --months 36
+Uses DATABASE_URL from .env or the environment (SQLite default). The same seed,
+user count, row count and months always produce the same data (dates are relative
+to --end, default today).
+
+Users are bench1@example.com, bench2@example.com, ... with password
+"benchmark-password". Row counts are skewed so bench1 is the heaviest user.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+# Allow running from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, engine
+from app.models import Category, Transaction, User
+from app.models.transaction import TransactionType
+from app.services.auth import hash_password
+from app.services.categories import PREDEFINED_NAMES
+from app.services.rollups import rebuild_rollups
+from app.services.search import rebuild_search_index
+from app.startup import initialize_database
+
+BENCH_PASSWORD = "benchmark-password"
+
+# Discretionary spending: category -> (share of rows, median amount, descriptions)
+SPENDING = {
+    "Food": (0.42, 18.0, ["Groceries", "Coffee", "Lunch", "Bakery", "Takeaway", "Supermarket"]),
+    "Transport": (0.22, 9.0, ["Bus ticket", "Fuel", "Train", "Taxi", "Parking"]),
+    "Entertainment": (0.14, 35.0, ["Cinema", "Concert", "Streaming", "Books", "Games"]),
+    "Health": (0.06, 55.0, ["Pharmacy", "Dentist", "Gym"]),
+    "Other": (0.10, 30.0, ["Gift", "Clothes", "Hardware store", None]),
+    "custom": (0.06, 45.0, ["Hobby supplies", "Subscription", None]),
+}
+CUSTOM_CATEGORY_NAMES = ["Pets", "Travel", "Kids", "Education", "Garden", "Charity"]
+
+
+def _user_row_counts(rng: random.Random, users: int, rows: int) -> list[int]:
+    """Split rows across users with a long tail: a few heavy users, many light ones."""
+    weights = [1 / (i + 1) ** 0.8 for i in range(users)]
+    scale = rows / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    counts[0] += rows - sum(counts)
+    return counts
+
+
+def _amount(rng: random.Random, median: float) -> Decimal:
+    value = rng.lognormvariate(math.log(median), 0.6)
+    return Decimal(str(round(max(value, 0.5), 2)))
+
+
+def _user_transactions(
+    rng: random.Random,
+    user_id: int,
+    n: int,
+    start: date,
+    end: date,
+    categories: dict[str, int],
+    custom_ids: list[int],
+):
+    """Yield n transaction dicts: monthly salary, rent and utilities, then daily spending."""
+    days = (end - start).days + 1
+    salary = Decimal(str(rng.randrange(2500, 9000)))
+    rent = Decimal(str(rng.randrange(600, 2500)))
+    recurring = []
+    month = start.replace(day=1)
+    while month <= end:
+        for day, kind in ((rng.randint(25, 28), "salary"), (rng.randint(1, 5), "rent"), (rng.randint(10, 20), "utilities")):
+            d = month.replace(day=day)
+            if start <= d <= end:
+                recurring.append((d, kind))
+        month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+    recurring = recurring[:n]
+    for d, kind in recurring:
+        if kind == "salary":
+            yield _row(user_id, salary, TransactionType.income, categories["Salary"], "Salary", d)
+        elif kind == "rent":
+            yield _row(user_id, rent, TransactionType.expense, categories["Rent"], "Rent", d)
+        else:
+            yield _row(user_id, _amount(rng, 120), TransactionType.expense, categories["Utilities"], "Electricity & water", d)
+
+    names = list(SPENDING)
+    shares = [SPENDING[k][0] for k in names]
+    for _ in range(n - len(recurring)):
+        d = start + timedelta(days=rng.randrange(days))
+        if rng.random() < 0.03:
+            yield _row(user_id, _amount(rng, 400), TransactionType.income, categories["Other"], "Freelance", d)
+            continue
+        name = rng.choices(names, shares)[0]
+        _, median, descriptions = SPENDING[name]
+        if name == "custom":
+            cat_id = rng.choice(custom_ids) if custom_ids else categories["Other"]
+        else:
+            cat_id = categories[name]
+        yield _row(user_id, _amount(rng, median), TransactionType.expense, cat_id, rng.choice(descriptions), d)
+
+
+def _row(user_id, amount, type_, category_id, description, d) -> dict:
+    return {
+        "user_id": user_id,
+        "amount": amount,
+        "type": type_,
+        "category_id": category_id,
+        "description": description,
+        "transaction_date": d,
+        "created_at": datetime.combine(d, datetime.min.time()),
+        "deleted_at": None,
+    }
+
+
+def prepare_schema() -> None:
+    initialize_database(engine)
+
+
+def generate(
+    db: Session,
+    users: int = 5,
+    rows: int = 10_000,
+    seed: int = 42,
+    months: int = 24,
+    end: date | None = None,
+    batch_size: int = 10_000,
+    email_prefix: str = "bench",
+    progress=None,
+) -> list[int]:
+    """Create users with skewed transaction histories; rebuild rollups and the search index.
+
+    Returns the new user ids, heaviest first. About 1% of rows are soft-deleted.
+    """
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = end - timedelta(days=round(months * 30.44))
+    predefined = {
+        c.name: c.id
+        for c in db.execute(select(Category).where(Category.user_id.is_(None))).scalars()
+    }
+    missing = set(PREDEFINED_NAMES) - set(predefined)
+    if missing:
+        raise RuntimeError(f"Predefined categories missing: {sorted(missing)}; run prepare_schema() first")
+    # Cost 4 (bcrypt's minimum): generation is about data, not hashing
+    hashed = hash_password(BENCH_PASSWORD, rounds=4)
+
+    user_ids = []
+    for i in range(users):
+        user = User(email=f"{email_prefix}{i + 1}@example.com", hashed_password=hashed)
+        db.add(user)
+        db.flush()
+        user_ids.append(user.id)
+    custom: dict[int, list[int]] = {}
+    for user_id in user_ids:
+        names = rng.sample(CUSTOM_CATEGORY_NAMES, rng.randint(0, 3))
+        cats = [Category(name=n, user_id=user_id, is_predefined=False) for n in names]
+        db.add_all(cats)
+        db.flush()
+        custom[user_id] = [c.id for c in cats]
+    db.commit()
+
+    written = 0
+    batch: list[dict] = []
+    for user_id, n in zip(user_ids, _user_row_counts(rng, users, rows)):
+        for row in _user_transactions(rng, user_id, n, start, end, predefined, custom[user_id]):
+            if rng.random() < 0.01:
+                row["deleted_at"] = datetime.combine(row["transaction_date"], datetime.min.time())
+            batch.append(row)
+            if len(batch) >= batch_size:
+                db.execute(insert(Transaction), batch)
+                db.commit()
+                written += len(batch)
+                batch.clear()
+                if progress:
+                    progress(written, rows)
+    if batch:
+        db.execute(insert(Transaction), batch)
+        db.commit()
+        written += len(batch)
+    rebuild_rollups(db)
+    rebuild_search_index(db)
+    db.commit()
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=10_000, help="Total transactions across all users")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--months", type=int, default=24, help="History length, ending at --end")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last transaction date (default today)")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--email-prefix", default="bench")
+    args = parser.parse_args()
+
+    prepare_schema()
+    with SessionLocal() as db:
+        taken = db.execute(
+            select(User.email).where(User.email.like(f"{args.email_prefix}%@example.com")).limit(1)
+        ).scalar()
+        if taken:
+            print(f"{taken} already exists; use another --email-prefix or a fresh database")
+            return 1
+        started = time.perf_counter()
+
+        def progress(done: int, total: int) -> None:
+            print(f"  {done:,}/{total:,} rows", end="\r", flush=True)
+
+        user_ids = generate(
+            db, users=args.users, rows=args.rows, seed=args.seed, months=args.months,
+            end=args.end, batch_size=args.batch_size, email_prefix=args.email_prefix, progress=progress,
+        )
+    elapsed = time.perf_counter() - started
+    print()
+    print(f"Created {len(user_ids)} users and {args.rows:,} transactions in {elapsed:.1f}s")
+    print(f"Log in as {args.email_prefix}1@example.com / {BENCH_PASSWORD}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Bulk-import transactions from a CSV or OFX/QFX file for one user. Run from project root:
+  python scripts/import_transactions.py you@example.com statement.csv
+  python scripts/import_transactions.py you@example.com bank.ofx --default-category Other
+Uses DATABASE_URL from .env or the environment (SQLite default).
+"""
+import argparse
+import os
+import sys
+import time
+
+# Allow running from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from app.config import IMPORT_BATCH_SIZE
+from app.database import SessionLocal
+from app.models import User
+from app.services.imports import import_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("email", help="Email of the user to import for")
+    parser.add_argument("path", help="CSV or OFX/QFX file")
+    parser.add_argument("--format", choices=["csv", "ofx"], default=None, help="Default: detect from file")
+    parser.add_argument("--default-category", default="Other", help="Category for rows without one")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        user_id = db.execute(select(User.id).where(User.email == args.email)).scalar_one_or_none()
+    if user_id is None:
+        print(f"No user with email {args.email}")
+        return 1
+    started = time.perf_counter()
+    with open(args.path, encoding="utf-8-sig", errors="replace", newline="") as f:
+        result = import_file(
+            user_id, f, filename=args.path, fmt=args.format,
+            default_category=args.default_category, batch_size=args.batch_size,
+        )
+    elapsed = time.perf_counter() - started
+    for line, message in result["errors"]:
+        print(f"  line {line}: {message}")
+    print(f"Imported {result['imported']} rows in {elapsed:.1f}s, {len(result['errors'])} errors")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
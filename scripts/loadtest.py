@@ -0,0 +1,277 @@
+"""
+Concurrent-user load test against the in-process ASGI app. Run from project root:
+  python scripts/loadtest.py                                  # 10 users for 20s
+  python scripts/loadtest.py --concurrency 1,10,50,100 --duration 30 --out load.json
+  python scripts/loadtest.py --concurrency 50 --think-ms 500 --rows 500000
+Each virtual user runs a scripted session through httpx.ASGITransport (no network, no
+server): register a fresh account and log out, log in to a seeded account with
+history, then loop over the dashboard, transaction list (next page, category filter,
+HTMX filter, HTMX search as you type), create and edit, and insights period switches (full page and HTMX).
+
+The database is a temp SQLite file (or --db) seeded with scripts/generate_data.py;
+DATABASE_URL is ignored. Reports requests/s and p50/p95/p99 per step for each
+concurrency level. Client and app share one event loop, so the numbers describe one
+worker process with its client overhead included.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Allow running from project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CSRF_RE = re.compile(r'name="csrf_token" value="([^"]+)"')
+CURSOR_RE = re.compile(r'\?cursor=([^&"]+)[^"]*">Next<')
+EDIT_RE = re.compile(r'/transactions/(\d+)/edit')
+CATEGORY_RE = re.compile(r'<option value="(\d+)"')
+# Words from the generated descriptions, typed a few keystrokes at a time by the search step
+SEARCH_WORDS = ["coffee", "groceries", "supermarket", "fuel", "pharmacy", "cinema"]
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Recorder:
+    """Latency samples and status codes per step."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+        self.statuses: dict[str, dict[int, int]] = {}
+        self.errors: dict[str, int] = {}
+
+    def record(self, step: str, seconds: float, status: int, ok: bool) -> None:
+        self.samples.setdefault(step, []).append(seconds)
+        counts = self.statuses.setdefault(step, {})
+        counts[status] = counts.get(status, 0) + 1
+        if not ok:
+            self.errors[step] = self.errors.get(step, 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        steps = {}
+        for step, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            steps[step] = {
+                "requests": len(ordered),
+                "errors": self.errors.get(step, 0),
+                "rps": round(len(ordered) / elapsed, 2),
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+                "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+                "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+                "statuses": {str(k): v for k, v in sorted(self.statuses[step].items())},
+            }
+        total = sum(s["requests"] for s in steps.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total,
+            "errors": sum(s["errors"] for s in steps.values()),
+            "rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "steps": steps,
+        }
+
+
+class VirtualUser:
+    def __init__(self, n: int, client, recorder: Recorder, think: float, rng: random.Random, run_id: str):
+        self.n = n
+        self.client = client
+        self.recorder = recorder
+        self.think = think
+        self.rng = rng
+        self.run_id = run_id
+        self.categories: list[str] = []
+
+    async def request(self, step: str, method: str, url: str, expect=(200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            r = await self.client.request(method, url, **kwargs)
+            await r.aread()
+        except Exception:
+            self.recorder.record(step, time.perf_counter() - started, 599, False)
+            return None
+        self.recorder.record(step, time.perf_counter() - started, r.status_code, r.status_code in expect)
+        if self.think:
+            await asyncio.sleep(self.rng.uniform(0, self.think))
+        return r
+
+    async def csrf(self, step: str, url: str) -> str | None:
+        r = await self.request(step, "GET", url)
+        if r is None:
+            return None
+        m = CSRF_RE.search(r.text)
+        if url.startswith("/transactions/new"):
+            self.categories = CATEGORY_RE.findall(r.text)
+        return m.group(1) if m else None
+
+    async def start_session(self, password: str) -> bool:
+        token = await self.csrf("register_page", "/register")
+        if token:
+            await self.request("register_submit", "POST", "/register", expect=(303,), data={
+                "csrf_token": token,
+                "email": f"vu{self.n}-{self.run_id}-{self.rng.randrange(10**9)}@example.com",
+                "password": password,
+            })
+            await self.request("logout", "GET", "/logout", expect=(303,))
+        token = await self.csrf("login_page", "/login")
+        if not token:
+            return False
+        r = await self.request("login_submit", "POST", "/login", expect=(303,), data={
+            "csrf_token": token, "email": f"load{self.n}@example.com", "password": password,
+        })
+        return r is not None and r.status_code == 303
+
+    async def iteration(self) -> None:
+        await self.request("dashboard_page", "GET", "/dashboard")
+        r = await self.request("transactions_list", "GET", "/transactions")
+        if r is not None:
+            m = CURSOR_RE.search(r.text)
+            if m:
+                await self.request("transactions_list (next page)", "GET", f"/transactions?cursor={m.group(1)}")
+        token = await self.csrf("transaction_new", "/transactions/new")
+        if self.categories:
+            await self.request(
+                "transactions_list (category filter)", "GET",
+                f"/transactions?category_id={self.rng.choice(self.categories)}",
+            )
+        await self.request(
+            "transactions_list (htmx filter)", "GET", "/transactions?date_from=&date_to=&category_id=&type=expense",
+            headers={"HX-Request": "true"},
+        )
+        word = self.rng.choice(SEARCH_WORDS)
+        for n in range(2, min(len(word), 5) + 1):
+            await self.request("transactions_list (htmx search)", "GET", f"/transactions?q={word[:n]}",
+                               headers={"HX-Request": "true"})
+        if token and self.categories:
+            day = date.today() - timedelta(days=self.rng.randrange(60))
+            await self.request("transaction_create", "POST", "/transactions", expect=(303,), data={
+                "csrf_token": token,
+                "amount": f"{self.rng.uniform(2, 120):.2f}",
+                "type": "expense",
+                "category_id": self.rng.choice(self.categories),
+                "transaction_date": day.isoformat(),
+                "description": "Load test",
+            })
+        r = await self.request("transactions_list", "GET", "/transactions")
+        m = EDIT_RE.search(r.text) if r is not None else None
+        if m:
+            edit_url = f"/transactions/{m.group(1)}/edit"
+            token = await self.csrf("transaction_edit", edit_url)
+            if token and self.categories:
+                await self.request("transaction_update", "POST", f"/transactions/{m.group(1)}", expect=(303,), data={
+                    "csrf_token": token,
+                    "amount": f"{self.rng.uniform(2, 120):.2f}",
+                    "type": "expense",
+                    "category_id": self.rng.choice(self.categories),
+                    "transaction_date": (date.today() - timedelta(days=self.rng.randrange(30))).isoformat(),
+                    "description": "Load test (edited)",
+                })
+        await self.request("insights_page", "GET", "/insights?period=30")
+        await self.request("insights_page (htmx)", "GET", "/insights?period=6months", headers={"HX-Request": "true"})
+        start = date.today() - timedelta(days=self.rng.randrange(90, 400))
+        await self.request(
+            "insights_page (htmx)", "GET",
+            f"/insights?period=custom&date_from={start.isoformat()}&date_to={date.today().isoformat()}",
+            headers={"HX-Request": "true"},
+        )
+
+
+async def run_level(app, users: int, duration: float, ramp_up: float, think: float, password: str, seed: int) -> dict:
+    import httpx
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    deadline = time.perf_counter() + ramp_up + duration
+    run_id = f"{users}-{int(time.time())}"
+
+    async def session(n: int) -> None:
+        rng = random.Random(seed * 100_003 + n)
+        await asyncio.sleep(ramp_up * (n - 1) / users)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            vu = VirtualUser(n, client, recorder, think, rng, run_id)
+            if not await vu.start_session(password):
+                return
+            while time.perf_counter() < deadline:
+                await vu.iteration()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(session(n) for n in range(1, users + 1)))
+    return recorder.report(time.perf_counter() - started)
+
+
+def print_level(users: int, result: dict) -> None:
+    print(f"\n{users} concurrent users: {result['requests']} requests in {result['elapsed_s']}s, "
+          f"{result['rps']} req/s, {result['errors']} errors")
+    print(f"  {'step':<38} {'reqs':>6} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for step, s in result["steps"].items():
+        print(f"  {step:<38} {s['requests']:>6} {s['errors']:>5} {s['rps']:>8.1f} "
+              f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['max_ms']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="10", help="Comma-separated user counts to run in turn, e.g. 1,10,50")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per level after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=2, help="Seconds over which users start")
+    parser.add_argument("--think-ms", type=float, default=0, help="Max random pause between requests (0 = closed loop)")
+    parser.add_argument("--rows", type=int, default=20_000, help="Seeded history, total across load users")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--bcrypt-rounds", type=int, default=None, help="Override BCRYPT_ROUNDS for new accounts")
+    parser.add_argument("--db", default=None, help="SQLite file (default: temp dir, named after the dataset)")
+    parser.add_argument("--out", default=None, help="Write JSON results here")
+    args = parser.parse_args()
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    max_users = max(levels)
+
+    db_path = args.db or os.path.join(
+        tempfile.gettempdir(), f"financetracker-load-{args.rows}-{max_users}-{args.seed}.db"
+    )
+    # Before any app import: app.config reads these once
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.environ.setdefault("TEMPLATE_PRECOMPILE", "1")
+    if args.bcrypt_rounds:
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+
+    from sqlalchemy import select
+    from app.database import SessionLocal
+    from app.models import User
+    from generate_data import BENCH_PASSWORD, generate, prepare_schema
+
+    prepare_schema()
+    with SessionLocal() as db:
+        if db.execute(select(User.id).where(User.email == f"load{max_users}@example.com")).scalar() is None:
+            print(f"Seeding {args.rows:,} transactions for {max_users} load users ...")
+            generate(db, users=max_users, rows=args.rows, seed=args.seed, email_prefix="load")
+    from app.main import app
+
+    results = {}
+    for users in levels:
+        result = asyncio.run(run_level(
+            app, users, args.duration, args.ramp_up, args.think_ms / 1000, BENCH_PASSWORD, args.seed,
+        ))
+        results[str(users)] = result
+        print_level(users, result)
+
+    print(f"\n{'users':>6} {'req/s':>9} {'errors':>7} {'p95 ms (worst step)':>22}")
+    for users, r in results.items():
+        worst = max((s["p95_ms"] for s in r["steps"].values()), default=0)
+        print(f"{users:>6} {r['rps']:>9.1f} {r['errors']:>7} {worst:>22.1f}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"database": db_path, "think_ms": args.think_ms, "levels": results}, f, indent=2)
+        print(f"Wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
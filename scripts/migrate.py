@@ -0,0 +1,58 @@
+"""
+Apply schema migrations and check that hot queries use their indexes. Run from project root:
+  python scripts/migrate.py status
+  python scripts/migrate.py upgrade    # create tables, migrate, seed (release step with DB_INIT_ON_STARTUP=0)
+  python scripts/migrate.py check      # EXPLAIN list/recent/insights queries; exit 1 if an index is unused
+  python scripts/migrate.py reindex    # rebuild the SQLite full-text search table from transactions
+Uses DATABASE_URL from .env or the environment (SQLite default).
+"""
+import argparse
+import os
+import sys
+
+# Allow running from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine, SessionLocal
+from app.migrations import MIGRATIONS, applied_versions, check_index_usage
+from app.startup import initialize_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["status", "upgrade", "check", "reindex"])
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print query plans")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        done = applied_versions(engine)
+        for version, name, _ in MIGRATIONS:
+            print(f"  [{'x' if version in done else ' '}] {version:03d} {name}")
+        return 0
+    if args.command == "upgrade":
+        result = initialize_database(engine)
+        applied = result["migrations"]
+        print(f"Applied {len(applied)} migrations" + (f": {applied}" if applied else "")
+              + f", seeded {result['seeded']} categories")
+        return 0
+    if args.command == "reindex":
+        from app.services.search import needs_sync, rebuild_search_index
+        with SessionLocal() as db:
+            if not needs_sync(db):
+                print("Nothing to do: the database maintains its own search index")
+                return 0
+            rebuild_search_index(db)
+            db.commit()
+        print("Rebuilt the search index")
+        return 0
+    results = check_index_usage(engine)
+    for r in results:
+        print(f"  {'ok  ' if r['ok'] else 'MISS'} {r['query']} -> {r['index']}")
+        if args.verbose or not r["ok"]:
+            for line in r["plan"].splitlines():
+                print(f"         {line}")
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
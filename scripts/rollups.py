@@ -0,0 +1,58 @@
+"""
+Rebuild or verify the monthly rollup table. Run from project root:
+  python scripts/rollups.py rebuild [--user ID]
+  python scripts/rollups.py verify [--user ID]
+  python scripts/rollups.py reconcile [--months N]   # periodic job, e.g. hourly cron
+reconcile verifies (the last N months, or all) and rebuilds only the users that differ.
+Uses DATABASE_URL from .env or the environment (SQLite default).
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+# Allow running from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.services.rollups import rebuild_rollups, reconcile_rollups, verify_rollups
+from app.startup import initialize_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["rebuild", "verify", "reconcile"])
+    parser.add_argument("--user", type=int, default=None, help="Limit to one user id")
+    parser.add_argument("--months", type=int, default=None, help="reconcile: check only the last N months")
+    args = parser.parse_args()
+
+    initialize_database(engine)
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            n = rebuild_rollups(db, args.user)
+            print(f"Rebuilt {n} rollup rows")
+            return 0
+        if args.command == "reconcile":
+            since = None
+            if args.months:
+                today = date.today()
+                first = today.year * 12 + today.month - args.months
+                since = date(first // 12, first % 12 + 1, 1)
+            users = reconcile_rollups(db, since)
+            print(f"Rebuilt rollups for {len(users)} users" + (f": {users}" if users else ""))
+            return 0
+        mismatches = verify_rollups(db, args.user)
+        for m in mismatches:
+            print(
+                f"  user={m['user_id']} month={m['month']} category={m['category_id']} "
+                f"type={m['type']} expected={m['expected']} actual={m['actual']}"
+            )
+        print(f"{len(mismatches)} mismatched rollup rows")
+        return 1 if mismatches else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Test setup: a throwaway SQLite database, initialized once per session."""
+import os
+import re
+import sys
+import tempfile
+
+import pytest
+
+# Before any app import: app.config reads these once
+_DB_DIR = tempfile.mkdtemp(prefix="financetracker-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Query budget: a request over the limit or with an N+1 pattern fails the test
+os.environ["SQL_STRICT"] = "1"
+os.environ.setdefault("SQL_MAX_QUERIES", "15")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CSRF_RE = re.compile(r'name="csrf_token" value="([^"]+)"')
+
+
+@pytest.fixture(scope="session")
+def engine():
+    from app.database import engine
+    from app.startup import initialize_database
+    initialize_database(engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    from app.database import SessionLocal
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def user_id(db):
+    from app.models import User
+    from app.services.auth import hash_password
+    user = User(email=f"user{os.urandom(4).hex()}@example.com", hashed_password=hash_password("password123"))
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+@pytest.fixture
+def client(engine):
+    """A logged-in TestClient for a fresh user."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as c:
+        token = CSRF_RE.search(c.get("/register").text).group(1)
+        r = c.post("/register", data={
+            "csrf_token": token, "email": f"web{os.urandom(4).hex()}@example.com", "password": "password123",
+        }, follow_redirects=False)
+        assert r.status_code == 303
+        yield c
+
+
+def csrf_token(client, url: str) -> str:
+    return CSRF_RE.search(client.get(url).text).group(1)
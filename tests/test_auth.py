@@ -0,0 +1,46 @@
+import os
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.config import HASH_QUEUE_SIZE, HASH_WORKERS
+from app.models import User
+from app.services import auth
+
+from conftest import csrf_token
+
+
+def test_login_backs_off_when_the_hash_pool_is_full(engine, db):
+    from app.main import app
+    email = f"busy{os.urandom(4).hex()}@example.com"
+    db.add(User(email=email, hashed_password=auth.hash_password("password123")))
+    db.commit()
+    capacity = HASH_WORKERS + HASH_QUEUE_SIZE
+    release = threading.Event()
+
+    with TestClient(app) as c:
+        # Occupy every worker and queue slot with jobs that block until released
+        blockers = [c.portal.start_task_soon(auth._run_in_hash_pool, release.wait) for _ in range(capacity)]
+        try:
+            deadline = time.monotonic() + 5
+            while auth.hash_pool_in_flight() < capacity and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert auth.hash_pool_in_flight() == capacity
+
+            r = c.post("/login", data={
+                "csrf_token": csrf_token(c, "/login"), "email": email, "password": "password123",
+            }, follow_redirects=False)
+            assert r.status_code == 503
+            assert r.headers["Retry-After"] == "1"
+            assert "server is busy" in r.text
+        finally:
+            release.set()
+            for blocker in blockers:
+                blocker.result(timeout=5)
+
+        assert auth.hash_pool_in_flight() == 0
+        r = c.post("/login", data={
+            "csrf_token": csrf_token(c, "/login"), "email": email, "password": "password123",
+        }, follow_redirects=False)
+        assert r.status_code == 303
@@ -0,0 +1,27 @@
+import re
+
+import pytest
+
+from conftest import csrf_token
+
+
+@pytest.mark.parametrize("amount", ["NaN", "Infinity", "-Infinity", "sNaN"])
+def test_set_budget_rejects_non_finite_amounts(client, amount):
+    page = client.get("/budgets").text
+    food = re.search(r'<option value="(\d+)">Food</option>', page).group(1)
+    r = client.post("/budgets", data={
+        "csrf_token": csrf_token(client, "/budgets"), "category_id": food, "amount": amount,
+    }, follow_redirects=False)
+    assert r.status_code == 200
+    assert "Budget must be a positive number." in r.text
+    assert "/delete" not in client.get("/budgets").text
+
+
+def test_set_budget_accepts_positive_amount(client):
+    page = client.get("/budgets").text
+    food = re.search(r'<option value="(\d+)">Food</option>', page).group(1)
+    r = client.post("/budgets", data={
+        "csrf_token": csrf_token(client, "/budgets"), "category_id": food, "amount": "120.50",
+    }, follow_redirects=False)
+    assert r.status_code == 303
+    assert "120.50" in client.get("/budgets").text
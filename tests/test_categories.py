@@ -0,0 +1,32 @@
+from sqlalchemy import delete, insert, select
+
+from app.models import Category
+from app.services.categories import get_category_for_user, get_user_categories
+from app.services.data_version import bump_data_version
+
+
+def _write_elsewhere(db, user_id, stmt):
+    """A category write as another worker makes it: data version bumped, this process's
+    category cache left alone (bump_data_version only drops the version cache entry)."""
+    db.execute(stmt)
+    bump_data_version(db, user_id)
+    db.commit()
+
+
+def test_category_cache_follows_data_version(db, user_id):
+    before = {c.name for c in get_user_categories(db, user_id).items}
+    assert "Pets" not in before
+
+    _write_elsewhere(db, user_id, insert(Category).values(user_id=user_id, name="Pets", is_predefined=False))
+    pets = db.execute(select(Category.id).where(Category.user_id == user_id, Category.name == "Pets")).scalar_one()
+    assert "Pets" in {c.name for c in get_user_categories(db, user_id).items}
+    assert get_category_for_user(db, user_id, pets) is not None
+
+    _write_elsewhere(db, user_id, delete(Category).where(Category.id == pets))
+    assert pets not in get_user_categories(db, user_id).by_id
+    assert get_category_for_user(db, user_id, pets) is None
+
+
+def test_category_cache_hit_without_writes(db, user_id):
+    first = get_user_categories(db, user_id)
+    assert get_user_categories(db, user_id) is first
@@ -0,0 +1,29 @@
+from sqlalchemy import event
+
+from app.database import SessionLocal
+from app.services.data_version import bump_data_version, get_data_version, version_cache
+
+
+def test_version_read_overlapping_a_commit_is_not_cached(engine, db, user_id):
+    version = get_data_version(db, user_id)
+    version_cache.pop(user_id)
+    raced = []
+
+    def commit_a_bump(conn, cursor, statement, parameters, context, executemany):
+        # After the reader's SELECT has run, before it caches what it read
+        if raced or "data_version" not in statement or "UPDATE" in statement:
+            return
+        raced.append(statement)
+        with SessionLocal() as writer:
+            bump_data_version(writer, user_id)
+            writer.commit()
+
+    event.listen(engine, "after_cursor_execute", commit_a_bump)
+    try:
+        assert get_data_version(db, user_id) == version
+    finally:
+        event.remove(engine, "after_cursor_execute", commit_a_bump)
+
+    assert raced
+    assert version_cache.get(user_id) is None
+    assert get_data_version(db, user_id) == version + 1
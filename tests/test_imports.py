@@ -0,0 +1,17 @@
+import io
+
+from app.services.imports import import_file
+
+
+def test_import_rejects_non_finite_amounts(user_id):
+    text = io.StringIO(
+        "date,type,category,amount,description\n"
+        "2026-01-01,expense,Food,NaN,a\n"
+        "2026-01-02,expense,Food,Infinity,b\n"
+        "2026-01-03,,Food,-Infinity,c\n"
+        "2026-01-04,expense,Food,5,d\n"
+    )
+    result = import_file(user_id, text)
+    assert result["imported"] == 1
+    assert [line for line, _ in result["errors"]] == [2, 3, 4]
+    assert all(message == "Amount must be a positive number." for _, message in result["errors"])
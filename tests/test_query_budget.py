@@ -0,0 +1,29 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.config import SQL_N_PLUS_ONE_THRESHOLD, SQL_STRICT
+from app.middleware import QueryBudgetExceeded, QueryStatsMiddleware
+from app.models import Category
+
+
+def _app_running(queries):
+    def endpoint(request):
+        queries()
+        return PlainTextResponse("ok")
+    return QueryStatsMiddleware(Starlette(routes=[Route("/", endpoint)]))
+
+
+def test_n_plus_one_fails_the_request(engine):
+    assert SQL_STRICT
+
+    def one_query_per_category():
+        with engine.connect() as conn:
+            for category_id in range(SQL_N_PLUS_ONE_THRESHOLD):
+                conn.execute(select(Category.name).where(Category.id == category_id))
+
+    with TestClient(_app_running(one_query_per_category)) as c, pytest.raises(QueryBudgetExceeded, match="N\\+1"):
+        c.get("/")
@@ -0,0 +1,56 @@
+from sqlalchemy import select
+
+from app.models import MonthlyRollup, User
+from app.services.categories import get_user_categories
+from app.services.data_version import get_data_version
+from app.services.rollups import rebuild_rollups, verify_rollups
+from app.services.transactions import create_transaction, soft_delete_transaction, update_transaction
+
+
+def _stored_version(db, user_id) -> int:
+    return db.execute(select(User.data_version).where(User.id == user_id)).scalar_one()
+
+
+def test_rebuild_bumps_data_versions(db, user_id):
+    # Cached, as a web worker would have it
+    version = get_data_version(db, user_id)
+
+    rebuild_rollups(db, user_id)
+    assert _stored_version(db, user_id) == version + 1
+    assert get_data_version(db, user_id) == version + 1
+
+    rebuild_rollups(db)
+    assert _stored_version(db, user_id) == version + 2
+    assert get_data_version(db, user_id) == version + 2
+
+
+def test_rollups_follow_creates_updates_and_deletes(db, user_id):
+    food, rent = (c.id for c in get_user_categories(db, user_id).items[:2])
+
+    def create(amount, type_, category_id, day):
+        trans, error = create_transaction(db, user_id, amount, type_, str(category_id), None, day)
+        assert error is None
+        return trans.id
+
+    def update(tid, amount, type_, category_id, day):
+        trans, error = update_transaction(db, user_id, tid, amount, type_, str(category_id), None, day)
+        assert error is None
+
+    a = create("12.50", "expense", food, "2026-01-31")
+    b = create("800", "expense", rent, "2026-02-01")
+    c = create("2500", "income", food, "2026-02-15")
+    d = create("40", "expense", food, "2026-02-15")
+    create("7.25", "expense", food, "2026-01-05")
+    assert db.execute(select(MonthlyRollup).where(MonthlyRollup.user_id == user_id)).first()
+    assert verify_rollups(db, user_id) == []
+
+    update(a, "13.75", "expense", food, "2026-01-31")   # amount
+    update(b, "800", "expense", rent, "2026-03-01")     # date, into another month
+    update(d, "40", "expense", rent, "2026-02-15")      # category
+    update(c, "2500", "expense", food, "2026-02-15")    # type
+    update(a, "99", "income", rent, "2026-04-10")       # everything at once
+    assert verify_rollups(db, user_id) == []
+
+    assert soft_delete_transaction(db, user_id, b)
+    assert soft_delete_transaction(db, user_id, d)
+    assert verify_rollups(db, user_id) == []
@@ -0,0 +1,71 @@
+import base64
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models import Transaction
+from app.services.categories import get_user_categories
+from app.services.transactions import _decode_cursor, create_transaction, list_transactions
+
+
+@pytest.fixture
+def transactions(db, user_id) -> list[int]:
+    """23 transactions over 5 days (several per day), ids newest first as the list sorts them."""
+    category_id = get_user_categories(db, user_id).items[0].id
+    for i in range(23):
+        day = date(2026, 3, 1) + timedelta(days=i % 5)
+        trans, error = create_transaction(db, user_id, str(10 + i), "expense", str(category_id), None, day.isoformat())
+        assert error is None
+    return list(db.execute(
+        select(Transaction.id)
+        .where(Transaction.user_id == user_id)
+        .order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+    ).scalars())
+
+
+def _ids(page: dict) -> list[int]:
+    return [t.id for t in page["items"]]
+
+
+def test_keyset_pages_forward_and_back(db, user_id, transactions):
+    pages = [list_transactions(db, user_id, per_page=4)]
+    assert pages[0]["prev_cursor"] is None
+    while pages[-1]["next_cursor"]:
+        pages.append(list_transactions(db, user_id, per_page=4, cursor=pages[-1]["next_cursor"]))
+    assert [i for page in pages for i in _ids(page)] == transactions
+    assert len(pages) == 6 and len(pages[-1]["items"]) == 3
+
+    # Back from the last page through prev cursors: the same pages in reverse
+    page = pages[-1]
+    for expected in reversed(pages[:-1]):
+        page = list_transactions(db, user_id, per_page=4, cursor=page["prev_cursor"])
+        assert _ids(page) == _ids(expected)
+        assert page["next_cursor"] is not None
+    assert page["prev_cursor"] is None
+
+
+def _cursor(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    _cursor("x|2026-03-02|5"),
+    _cursor("a|2026-13-02|5"),
+    _cursor("a|2026-03-02|five"),
+    _cursor("a|2026-03-02"),
+    _cursor("a|2026-03-02|5|6"),
+    base64.urlsafe_b64encode(b"\xff\xfe|").decode(),
+])
+def test_malformed_cursor_starts_from_the_first_page(db, user_id, transactions, cursor):
+    assert _decode_cursor(cursor) is None
+    page = list_transactions(db, user_id, per_page=4, cursor=cursor)
+    assert _ids(page) == transactions[:4]
+    assert page["prev_cursor"] is None
+
+
+def test_tampered_cursor_stays_within_the_user(db, user_id, transactions):
+    # A well-formed cursor naming any key only moves the window over this user's rows
+    page = list_transactions(db, user_id, per_page=50, cursor=_cursor("a|2999-01-01|999999999"))
+    assert _ids(page) == transactions
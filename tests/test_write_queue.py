@@ -0,0 +1,82 @@
+import asyncio
+import sqlite3
+
+import pytest
+from sqlalchemy import event, func, insert, select
+
+from app.models import Category
+from app.write_queue import WriteQueue
+
+
+def _job(db, value, commit=True):
+    return value
+
+
+def _add_category(db, user_id, name, commit=True):
+    db.execute(insert(Category).values(user_id=user_id, name=name, is_predefined=False))
+    return name
+
+
+def _fail_after_insert(db, user_id, name, commit=True):
+    _add_category(db, user_id, name)
+    raise ValueError("job failed")
+
+
+def _count_elsewhere(db, user_id, commit=True):
+    """Categories of the user as another connection sees them, mid-group."""
+    with sqlite3.connect(db.get_bind().url.database) as other:
+        return other.execute("SELECT count(*) FROM categories WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+
+def _user_categories(db, user_id) -> set[str]:
+    return set(db.execute(select(Category.name).where(Category.user_id == user_id)).scalars())
+
+
+def test_writer_survives_a_failing_group(engine):
+    queue = WriteQueue(window_ms=0)
+    working_factory = queue._session_factory
+
+    def broken_factory():
+        raise RuntimeError("no connection")
+
+    async def scenario():
+        queue._session_factory = broken_factory
+        with pytest.raises(RuntimeError, match="no connection"):
+            await asyncio.wait_for(queue.submit(_job, 1), timeout=5)
+        queue._session_factory = working_factory
+        return await asyncio.wait_for(queue.submit(_job, 2), timeout=5)
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_group_commits_once_and_isolates_failed_jobs(engine, db, user_id):
+    before = db.execute(select(func.count()).where(Category.user_id == user_id)).scalar()
+    queue = WriteQueue(window_ms=1000, max_batch=4)
+    commits = []
+
+    def on_commit(conn):
+        commits.append(conn)
+
+    event.listen(engine, "commit", on_commit)
+
+    async def scenario():
+        return await asyncio.gather(
+            queue.submit(_add_category, user_id, "Group A"),
+            queue.submit(_fail_after_insert, user_id, "Group Failed"),
+            queue.submit(_add_category, user_id, "Group B"),
+            queue.submit(_count_elsewhere, user_id),
+            return_exceptions=True,
+        )
+
+    try:
+        a, failed, b, seen_elsewhere = asyncio.run(scenario())
+    finally:
+        event.remove(engine, "commit", on_commit)
+
+    assert (a, b) == ("Group A", "Group B")
+    assert isinstance(failed, ValueError)
+    # Released savepoints are not commits: nothing of the group is visible before its commit
+    assert seen_elsewhere == before
+    assert queue.batches == 1 and len(commits) == 1
+    names = _user_categories(db, user_id)
+    assert {"Group A", "Group B"} <= names and "Group Failed" not in names